@@ -0,0 +1,63 @@
+'''
+Compare loading race result CSVs with the csv_loader module against the previous
+np.loadtxt based path.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_csv_loading --repeats 20 --synthetic-rows 20000
+'''
+import argparse
+import random
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+from src.csv_loader import load_race_list, load_race_results
+from src.utils import secs_to_time_str, time_str_to_secs
+
+def loadtxt_results(path:Path)->list[tuple[str,int]]:
+    #The loading path used before csv_loader
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        race_athletes = np.loadtxt(path, delimiter=',', dtype=str).reshape((-1,2))
+    return [(name, time_str_to_secs(race_time)) for name, race_time in race_athletes]
+
+def write_synthetic_results(path:Path, n_rows:int, seed:int=0):
+    rng = random.Random(seed)
+    with path.open('wt') as file_id:
+        for i_row in range(n_rows):
+            print(f'Runner {i_row}, {secs_to_time_str(rng.randrange(900, 20000))}', file=file_id)
+
+def time_loader(loader, paths:list[Path], repeats:int)->float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for path in paths:
+            loader(path)
+    return (time.perf_counter() - start) / repeats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--race-list', type=Path, default=Path('race_list.csv'))
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--synthetic-rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    season = [row.filepath for row in load_race_list(args.race_list) if row.filepath.suffix == '.csv']
+    season = [path for path in season if path.exists()]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        synthetic = Path(tmp_dir) / 'synthetic_results.csv'
+        write_synthetic_results(synthetic, args.synthetic_rows)
+
+        print(f'{"":>28} {"np.loadtxt (ms)":>16} {"csv_loader (ms)":>16} {"speed-up":>9}')
+        for label, paths in [
+            (f'season ({len(season)} files)', season), (f'synthetic ({args.synthetic_rows} rows)', [synthetic])]:
+            old = time_loader(loadtxt_results, paths, args.repeats)
+            new = time_loader(load_race_results, paths, args.repeats)
+            print(f'{label:>28} {1e3*old:16.2f} {1e3*new:16.2f} {old/new:8.1f}x')
+
+if __name__ == '__main__':
+    main()
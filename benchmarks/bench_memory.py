@@ -0,0 +1,87 @@
+'''
+Compare the memory and construction time of a season held as Athlete/RaceEntry
+objects with the same season held as a columnar EntryTable.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_memory --athletes 5000 --races 500 --entries 200
+'''
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+from src.athlete import Athlete
+from src.entry_table import EntryTable
+from src.race import Race
+from src.race_entry import RaceEntry
+
+def make_season(n_athletes:int, n_races:int, n_entries:int, seed:int=0):
+    rng = random.Random(seed)
+    athletes = {}
+    for i_athlete in range(n_athletes):
+        name = f'Athlete {i_athlete}'
+        athletes[name] = Athlete(
+            name=name,
+            dob=date(1950, 1, 1) + timedelta(days=rng.randrange(50*365)),
+            male=rng.random() < 0.5)
+
+    races = []
+    names = list(athletes)
+    for i_race in range(n_races):
+        race = Race(
+            name=f'Race {i_race}',
+            race_path=Path(f'race_{i_race}.csv'),
+            race_date=date(2025, 6, 1) + timedelta(days=i_race % 365),
+            distance=10.0,
+            is_5k=False,
+            is_marathon=False)
+        for name in rng.sample(names, min(n_entries, n_athletes)):
+            athlete = athletes[name]
+            race_entry = RaceEntry(
+                race_name=race.name,
+                athlete=name,
+                race_date=race.race_date,
+                time=rng.randrange(1800, 4800),
+                distance=race.distance,
+                male=athlete.male,
+                is_5k=False,
+                is_marathon=False,
+                age_pct=rng.uniform(40, 90))
+            athlete.add_race(race_entry, age_grade=False)
+            race.athletes.append(race_entry)
+        races.append(race)
+    return athletes, races
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--athletes', type=int, default=2000)
+    parser.add_argument('--races', type=int, default=200)
+    parser.add_argument('--entries', type=int, default=100, help='entries per race')
+    args = parser.parse_args()
+
+    (athletes, races), obj_time, obj_mem, obj_peak = measure(
+        lambda: make_season(args.athletes, args.races, args.entries))
+    table, table_time, table_mem, table_peak = measure(
+        lambda: EntryTable.from_races(athletes, races))
+
+    n_entries = len(table)
+    print(f'{args.athletes} athletes, {args.races} races, {n_entries} entries')
+    print(f'{"":>10} {"build (s)":>10} {"memory (MB)":>12} {"peak (MB)":>10} {"bytes/entry":>12}')
+    for label, elapsed, mem, peak in [
+        ('objects', obj_time, obj_mem, obj_peak), ('table', table_time, table_mem, table_peak)]:
+        print(f'{label:>10} {elapsed:10.3f} {mem/1e6:12.2f} {peak/1e6:10.2f} {mem/max(n_entries, 1):12.1f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+'''
+Time matching a big race field against the athlete list with the indexed NameResolver,
+against the naive approach of fuzzy matching each runner against every athlete.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_name_resolver --athletes 3000 --runners 20000 --naive-sample 200
+
+The naive time is measured on a sample of the runners and scaled up to the whole field.
+Members in the field have their names varied the ways results files do (nicknames, case,
+accents, 'SURNAME, First' and single typos), and the report shows how many of them
+were matched back to the right athlete, and how many other runners were matched at all.
+The made up names are much closer together than real ones, so expect some of those
+'''
+import argparse
+import random
+import time
+from collections import Counter
+
+from src.name_resolver import MAX_EDIT_DISTANCE, NICKNAMES, NameResolver, edit_distance, normalise_name
+
+#Last names are made up from these, so there are plenty of distinct but similar ones
+LAST_NAME_STARTS = [
+    'Ash', 'Bar', 'Brad', 'Brook', 'Chad', 'Cross', 'Dal', 'Dun', 'Ed', 'Fair', 'Fen', 'Gar', 'Green', 'Hal',
+    'Hart', 'Hey', 'Kirk', 'Lang', 'Lee', 'Mar', 'Mid', 'Mor', 'New', 'Nor', 'Old', 'Pen', 'Rad', 'Ray',
+    'Rich', 'Ship', 'South', 'Stan', 'Thorn', 'Wal', 'War', 'West', 'Whit', 'Wild', 'Wood', 'York']
+LAST_NAME_ENDS = [
+    'by', 'croft', 'den', 'field', 'ford', 'gate', 'ham', 'hurst', 'ington', 'ley', 'lock', 'man', 'more',
+    'ridge', 'shaw', 'stead', 'ton', 'well', 'wick', 'worth']
+FIRST_NAMES = list(NICKNAMES) + [
+    'Adam', 'Aisha', 'Amelia', 'Amy', 'Chloe', 'Claire', 'Emma', 'Fiona', 'Gareth', 'Grace', 'Hannah', 'Helen',
+    'Ian', 'Isla', 'Jack', 'Jade', 'Joanne', 'John', 'Karen', 'Laura', 'Lucy', 'Mark', 'Neil', 'Niamh',
+    'Olivia', 'Paul', 'Priya', 'Rachel', 'Ruth', 'Sarah', 'Siân', 'Simon', 'Sophie', 'Zoe', 'Gary', 'Kevin']
+
+def typo(name:str, rng:random.Random)->str:
+    #Swap, drop or double one letter of the last name
+    first_name, last_name = name.split(' ', 1)
+    i_char = rng.randrange(1, len(last_name) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        last_name = last_name[:i_char] + last_name[i_char+1] + last_name[i_char] + last_name[i_char+2:]
+    elif kind == 1:
+        last_name = last_name[:i_char] + last_name[i_char+1:]
+    else:
+        last_name = last_name[:i_char] + last_name[i_char] + last_name[i_char:]
+    return f'{first_name} {last_name}'
+
+def vary(name:str, rng:random.Random)->str:
+    first_name, last_name = name.split(' ', 1)
+    kind = rng.randrange(5)
+    if kind == 0:
+        return name
+    elif kind == 1 and first_name.lower() in NICKNAMES:
+        return f'{rng.choice(NICKNAMES[first_name.lower()]).title()} {last_name}'
+    elif kind == 2:
+        return f'{last_name.upper()}, {first_name}'
+    elif kind == 3:
+        return name.upper()
+    return typo(name, rng)
+
+def random_name(rng:random.Random)->str:
+    return f'{rng.choice(FIRST_NAMES).title()} {rng.choice(LAST_NAME_STARTS)}{rng.choice(LAST_NAME_ENDS)}'
+
+def make_league(n_athletes:int, n_runners:int, member_fraction:float, seed:int=0):
+    #Distinct athlete names, and a field of runners with a share of the members in it
+    rng = random.Random(seed)
+    athletes:set[str] = set()
+    while len(athletes) < n_athletes:
+        athletes.add(random_name(rng))
+    athlete_names = sorted(athletes)
+
+    n_members = int(member_fraction * n_runners)
+    members = rng.sample(athlete_names, min(n_members, n_athletes))
+    field = [(vary(name, rng), name) for name in members]
+    while len(field) < n_runners:
+        name = random_name(rng)
+        if name not in athletes:
+            field.append((name, None))
+    rng.shuffle(field)
+    return athlete_names, field
+
+def naive_match(name:str, athlete_keys:list[tuple[str,str]])->str:
+    #The closest athlete within the edit distance limit, comparing against every athlete
+    key = normalise_name(name)
+    best, best_distance = None, MAX_EDIT_DISTANCE + 1
+    for athlete_key, athlete_name in athlete_keys:
+        distance = edit_distance(key, athlete_key, MAX_EDIT_DISTANCE)
+        if distance < best_distance:
+            best, best_distance = athlete_name, distance
+    return best #type: ignore
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--athletes', type=int, default=3000)
+    parser.add_argument('--runners', type=int, default=20000)
+    parser.add_argument('--member-fraction', type=float, default=0.05)
+    parser.add_argument('--naive-sample', type=int, default=200)
+    args = parser.parse_args()
+
+    athlete_names, field = make_league(args.athletes, args.runners, args.member_fraction)
+
+    start = time.perf_counter()
+    resolver = NameResolver(athlete_names)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches = [resolver.resolve(name) for name, _ in field]
+    resolve_time = time.perf_counter() - start
+
+    athlete_keys = [(normalise_name(name), name) for name in athlete_names]
+    sample = field[:args.naive_sample]
+    start = time.perf_counter()
+    for name, _ in sample:
+        naive_match(name, athlete_keys)
+    naive_time = (time.perf_counter() - start) * len(field) / len(sample)
+
+    members = [(match, athlete) for match, (_, athlete) in zip(matches, field) if athlete is not None]
+    n_right = sum(match.athlete == athlete for match, athlete in members)
+    methods = Counter(match.method for match, _ in members)
+    others = Counter(
+        match.method for match, (_, athlete) in zip(matches, field) if athlete is None and match.athlete is not None)
+
+    print(f'{args.athletes} athletes, {len(field)} runners of which {len(members)} are members')
+    print(f'Index built in {1e3*build_time:.1f} ms')
+    print(f'Indexed:  {1e3*resolve_time:9.1f} ms ({1e6*resolve_time/len(field):.1f} us per runner)')
+    print(f'Naive:    {1e3*naive_time:9.1f} ms (estimated from {len(sample)} runners)')
+    print(f'Speed-up: {naive_time/(build_time + resolve_time):9.1f}x')
+    print(f'Members matched to the right athlete: {n_right}/{len(members)} ({dict(methods)})')
+    print(f'Other runners matched to an athlete: {sum(others.values())} ({dict(others)})')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+'''
+Time each stage of RaceProcessor.process_races on a synthetic league, reporting
+wall time, peak traced memory and the net number of allocated memory blocks.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_pipeline --athletes 5000 --races 200 --seasons 2 --jobs 4
+'''
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.synthetic_league import write_league
+from src.race_processor import RaceProcessor
+
+STAGES = [
+    'load_athletes',
+    'load_races',
+    'make_combined_5k',
+    'make_combined_marathon',
+    'update_athlete_scores',
+    'make_leaderboard',
+    'print_tables',
+]
+
+def time_stage(stage, trace_memory:bool)->tuple[float,float,int]:
+    blocks_before = sys.getallocatedblocks()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    stage()
+    elapsed = time.perf_counter() - start
+    peak = float('nan')
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak, sys.getallocatedblocks() - blocks_before
+
+def bench_season(race_list:Path, jobs:int, trace_memory:bool)->list[tuple[str,float,float,int]]:
+    rp = RaceProcessor(
+        athlete_list_path=Path('athletes_list.csv'),
+        race_list_path=race_list,
+        jobs=jobs)
+    return [(stage, *time_stage(getattr(rp, stage), trace_memory)) for stage in STAGES]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--athletes', type=int, default=1000)
+    parser.add_argument('--races', type=int, default=50, help='races per season')
+    parser.add_argument('--seasons', type=int, default=1)
+    parser.add_argument('--entries', type=int, default=100, help='entries per race')
+    parser.add_argument('--jobs', type=int, default=1, help='page rendering processes')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--no-memory', action='store_true', help="don't trace memory (tracing slows the stages down)")
+    args = parser.parse_args()
+
+    cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        start = time.perf_counter()
+        race_lists = write_league(root, args.athletes, args.races, args.seasons, args.entries, args.seed)
+        print(f'Generated league in {time.perf_counter() - start:.2f}s')
+
+        #RaceProcessor writes to docs/ relative to the working directory
+        (root / 'docs' / 'athletes').mkdir(parents=True)
+        (root / 'docs' / 'races').mkdir(parents=True)
+        os.chdir(root)
+        try:
+            for race_list in race_lists:
+                results = bench_season(race_list.relative_to(root), args.jobs, not args.no_memory)
+                print(f'\n{race_list.name}: {args.athletes} athletes, {args.races} races, {args.entries} entries per race')
+                print(f'{"stage":>24} {"wall (s)":>10} {"peak (MB)":>10} {"net blocks":>11}')
+                for stage, elapsed, peak, blocks in results:
+                    print(f'{stage:>24} {elapsed:10.3f} {peak/1e6:10.2f} {blocks:11d}')
+                total = sum(result[1] for result in results)
+                print(f'{"total":>24} {total:10.3f}')
+        finally:
+            os.chdir(cwd)
+
+if __name__ == '__main__':
+    main()
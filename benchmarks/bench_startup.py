@@ -0,0 +1,74 @@
+'''
+Time how long the command line and the main modules take to start, by running each in a
+fresh interpreter under `python -X importtime` and reading its import timings.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_startup --repeats 5 --top 8
+
+For each target the report gives the best wall time of the repeats, the total time spent
+importing, whether NumPy and the age grader were imported at all, and the imports that took
+longest (cumulative, so a package includes everything it imported). Run this before and
+after adding imports at the top of a module, or work when one is imported
+'''
+import argparse
+import subprocess
+import sys
+import time
+from typing import NamedTuple
+
+TARGETS = {
+    'cli --help': ['process_race_list.py', '--help'],
+    'import race_processor': ['-c', 'import src.race_processor'],
+    'import results_importer': ['-c', 'import src.results_importer'],
+    'import athlete': ['-c', 'import src.athlete'],
+    'first age factor': ['-c', 'from src.race_entry import age_factor_cache; age_factor_cache.get(40, True, 10.0)'],
+}
+HEAVY_MODULES = ['numpy', 'agegrader']
+
+class ImportTime(NamedTuple):
+    module:str
+    depth:int
+    self_us:int
+    cumulative_us:int
+
+def parse_importtime(stderr:str)->list[ImportTime]:
+    #Lines look like 'import time:  self [us] | cumulative | <indent>module', with two
+    #spaces of indent per level of nesting
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        name = module.lstrip()
+        imports.append(ImportTime(name, (len(module) - len(name) - 1) // 2, int(self_us), int(cumulative_us)))
+    return imports
+
+def run_target(args:list[str])->tuple[float,list[ImportTime]]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args], capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, parse_importtime(result.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8)
+    parser.add_argument('--target', action='append', choices=list(TARGETS), help='time only this target (repeatable)')
+    args = parser.parse_args()
+
+    for target in args.target or TARGETS:
+        #The first run also warms the bytecode cache, so the best of the rest is reported
+        runs = [run_target(TARGETS[target]) for _ in range(args.repeats + 1)][1:]
+        wall_time, imports = min(runs, key=lambda run:run[0])
+        total_us = sum(imported.cumulative_us for imported in imports if imported.depth == 0)
+        modules = {imported.module for imported in imports}
+        heavy = [module for module in HEAVY_MODULES if module in modules]
+
+        print(f'{target}: {1e3*wall_time:.1f} ms wall, {total_us/1e3:.1f} ms importing {len(imports)} modules')
+        print(f'    Heavy imports: {", ".join(heavy) if heavy else "none"}')
+        for imported in sorted(imports, key=lambda imported:imported.cumulative_us, reverse=True)[:args.top]:
+            print(f'    {imported.cumulative_us/1e3:8.1f} ms  {imported.module}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+'''
+Generate a synthetic league (athlete list, race lists and race result CSVs) in the
+same formats as the real inputs, for benchmarking at scale.
+
+Run from the repo root:
+
+    python -m benchmarks.synthetic_league <output-dir> --athletes 5000 --races 200 --seasons 3
+'''
+import argparse
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+from src.race_entry import MARATHON_KM
+from src.utils import date_to_str, secs_to_time_str
+
+#Mix of race types in a season: (distance string, distance km, is_5k, is_marathon, weight)
+RACE_TYPES = [
+    ('5 km', 5.0, 0, 0, 2),
+    ('10 km', 10.0, 0, 0, 3),
+    ('5 mi', 8.04672, 0, 0, 1),
+    ('10 mi', 16.0934, 0, 0, 1),
+    ('21.0975 km', 21.0975, 0, 0, 2),
+    ('5 km', 5.0, 1, 0, 3),
+    (f'{MARATHON_KM} km', MARATHON_KM, 0, 1, 1),
+]
+
+#Rough pace (secs per km) range of club runners
+PACE_RANGE = (200, 420)
+
+def season_start(season:int)->date:
+    #Seasons run June to May, with the most recent season (0) the one just finished
+    today = date.today()
+    first_year = today.year - 1 if today.month >= 6 else today.year - 2
+    return date(first_year - season, 6, 1)
+
+def race_list_path(root:Path, season:int)->Path:
+    return root / f'race_list_{season_start(season).year}.csv'
+
+def write_league(
+    root:Path, n_athletes:int, n_races:int, n_seasons:int=1, entries_per_race:int=100, seed:int=0)->list[Path]:
+    rng = random.Random(seed)
+    races_dir = root / 'races'
+    races_dir.mkdir(parents=True, exist_ok=True)
+
+    athletes = []
+    with (root / 'athletes_list.csv').open('wt') as file_id:
+        for i_athlete in range(n_athletes):
+            first_name, last_name = f'First{i_athlete}', f'Last{i_athlete}'
+            gender = 'Male' if rng.random() < 0.55 else 'Female'
+            dob = date(1945, 1, 1) + timedelta(days=rng.randrange(62*365))
+            pace = rng.uniform(*PACE_RANGE)
+            athletes.append((f'{first_name} {last_name}', pace))
+            print(f'{first_name},{last_name},{gender},{date_to_str(dob)}', file=file_id)
+
+    weights = [race_type[-1] for race_type in RACE_TYPES]
+    race_lists = []
+    for season in range(n_seasons):
+        start = season_start(season)
+        race_list = race_list_path(root, season)
+        with race_list.open('wt') as file_id:
+            print('Race, Distance, Date, 5k, Marathon, Datafile', file=file_id)
+            for i_race in range(n_races):
+                distance, distance_km, is_5k, is_marathon, _ = rng.choices(RACE_TYPES, weights)[0]
+                race_date = start + timedelta(days=rng.randrange(364))
+                name = f'Race {start.year} {i_race}'
+                race_path = races_dir / f'race_{start.year}_{i_race}.csv'
+
+                with race_path.open('wt') as race_file:
+                    for name_athlete, pace in rng.sample(athletes, min(entries_per_race, n_athletes)):
+                        race_time = int(distance_km * pace * rng.uniform(0.95, 1.1))
+                        print(f'{name_athlete},{secs_to_time_str(race_time)}', file=race_file)
+
+                print(
+                    f'{name},{distance},{date_to_str(race_date)},{is_5k},{is_marathon},'
+                    f'{race_path.relative_to(root).as_posix()}',
+                    file=file_id)
+        race_lists.append(race_list)
+    return race_lists
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('root', type=Path)
+    parser.add_argument('--athletes', type=int, default=1000)
+    parser.add_argument('--races', type=int, default=50, help='races per season')
+    parser.add_argument('--seasons', type=int, default=1)
+    parser.add_argument('--entries', type=int, default=100, help='entries per race')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    race_lists = write_league(args.root, args.athletes, args.races, args.seasons, args.entries, args.seed)
+    print(f'Wrote {args.athletes} athletes and {len(race_lists)} race lists to {args.root}')
+
+if __name__ == '__main__':
+    main()
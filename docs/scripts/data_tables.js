@@ -0,0 +1,158 @@
+// Tables written with --data-bundle: the rows are loaded from the page's JSON file and
+// only one page of them is in the DOM at a time. A long table's file holds just its first
+// page, and the whole table is fetched the first time it's sorted, filtered or paged
+// through. Each column's sort order is computed when the site is built, so sorting is
+// just reading rows in that order.
+
+document.addEventListener("DOMContentLoaded", function () {
+  document.querySelectorAll("div.data-table").forEach((container) => {
+    fetch(container.dataset.src)
+      .then((response) => response.json().then((data) => renderDataTable(container, data, response.url)))
+      .catch(() => {
+        container.textContent = "Unable to load the table";
+      });
+  });
+});
+
+function renderDataTable(container, first, src) {
+  const codes = first.codes;
+  const pageSize = first.page_size;
+  const activeFilters = {};
+  // Just the first page of rows until the whole table is fetched
+  let data = first;
+  let fullTable = first.all ? null : Promise.resolve(first);
+  // The rows shown, as indexes into data.rows, worked out again only when the sort or
+  // filters change
+  let visible = first.rows.map((_, i) => i);
+  let nRows = first.n_rows;
+  let sortColumn = null;
+  let descending = false;
+  let page = 0;
+
+  function cellText(row, colIndex) {
+    const value = row[colIndex];
+    if (codes[colIndex]) return codes[colIndex][value];
+    if (Array.isArray(value)) return value[0];
+    return String(value);
+  }
+
+  const table = document.createElement("table");
+  table.id = "sortableTable";
+  if (first.caption) {
+    table.createCaption().textContent = first.caption;
+  }
+  const headerRow = table.createTHead().insertRow();
+  first.headers.forEach((header, colIndex) => {
+    const th = document.createElement("th");
+    th.textContent = header;
+    th.addEventListener("click", () => sortBy(colIndex));
+    if (codes[colIndex]) {
+      const select = document.createElement("select");
+      ["All", ...codes[colIndex]].forEach((label) => {
+        select.add(new Option(label, label));
+      });
+      select.addEventListener("click", (event) => event.stopPropagation());
+      select.addEventListener("change", function () {
+        const selected = this.value;
+        withFullTable(() => {
+          activeFilters[colIndex] = selected;
+          page = 0;
+          refilter();
+        });
+      });
+      th.appendChild(select);
+    }
+    headerRow.appendChild(th);
+  });
+  const tbody = table.createTBody();
+  tbody.id = "tableBody";
+
+  const pager = document.createElement("p");
+  const previous = document.createElement("button");
+  previous.textContent = "Previous";
+  previous.addEventListener("click", () => withFullTable(() => (page -= 1)));
+  const next = document.createElement("button");
+  next.textContent = "Next";
+  next.addEventListener("click", () => withFullTable(() => (page += 1)));
+  const status = document.createElement("span");
+  pager.append(previous, " ", status, " ", next);
+
+  container.replaceChildren(table, pager);
+
+  function withFullTable(change) {
+    // Fetch the whole table once, then apply the change and redraw
+    if (fullTable === null) {
+      fullTable = fetch(new URL(first.all, src))
+        .then((response) => response.json())
+        .then((full) => {
+          data = full;
+          refilter();
+        });
+    }
+    fullTable
+      .then(() => {
+        change();
+        update();
+      })
+      .catch(() => {
+        fullTable = null;
+        status.textContent = "Unable to load the table";
+      });
+  }
+
+  function sortBy(colIndex) {
+    withFullTable(() => {
+      // Ascending on the first click, then toggle
+      descending = sortColumn === colIndex ? !descending : false;
+      sortColumn = colIndex;
+      page = 0;
+      refilter();
+    });
+  }
+
+  function refilter() {
+    const order = sortColumn === null ? data.rows.map((_, i) => i) : data.orders[sortColumn];
+    visible = order.filter((i) => {
+      for (const [colIndex, selected] of Object.entries(activeFilters)) {
+        if (selected !== "All" && cellText(data.rows[i], colIndex) !== selected) {
+          return false;
+        }
+      }
+      return true;
+    });
+    if (descending) visible.reverse();
+    nRows = visible.length;
+  }
+
+  function update() {
+    const nPages = Math.max(1, Math.ceil(nRows / pageSize));
+    page = Math.min(Math.max(page, 0), nPages - 1);
+    const start = page * pageSize;
+    const end = Math.min(start + pageSize, nRows);
+
+    tbody.replaceChildren();
+    visible.slice(start, end).forEach((i) => {
+      const tr = tbody.insertRow();
+      data.rows[i].forEach((value, colIndex) => {
+        const td = tr.insertCell();
+        if (Array.isArray(value) && !codes[colIndex]) {
+          const link = document.createElement("a");
+          link.href = value[1];
+          link.textContent = value[0];
+          td.appendChild(link);
+        } else {
+          td.textContent = cellText(data.rows[i], colIndex);
+        }
+      });
+    });
+
+    status.textContent = nRows
+      ? `Showing ${start + 1}-${end} of ${nRows}`
+      : "No matching rows";
+    previous.disabled = page === 0;
+    next.disabled = page >= nPages - 1;
+    pager.style.display = nRows > pageSize ? "" : "none";
+  }
+
+  update();
+}
@@ -28,13 +28,104 @@
     
 
 '''
+import argparse
 from pathlib import Path
-from src.race_processor import RaceProcessor
+
+def parse_args()->argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Build the ADAC road race championship pages')
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help='only reparse and rescore races whose CSV or race list entry has changed since the last run')
+    parser.add_argument(
+        '--store', type=Path, default=Path('.race_store.sqlite'),
+        help='results store used by --incremental (default: .race_store.sqlite)')
+    parser.add_argument(
+        '--factor-cache', type=Path, default=None,
+        help='file to keep the age grading factor cache in between runs')
+    parser.add_argument(
+        '--all-pages', action='store_true',
+        help='render every page, rather than only those whose contents have changed since the last run')
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=1,
+        help='number of worker processes used to render the pages (default: 1)')
+    parser.add_argument(
+        '--simulate', type=int, default=0, metavar='N',
+        help='run N simulations of the remaining club races and write the projected standings to docs/projections.html')
+    parser.add_argument(
+        '--archive', nargs='?', type=Path, const=Path('archive'), default=None, metavar='DIR',
+        help='keep each season\'s results in an archive (default: archive/) and show all-time history on the athlete pages')
+    parser.add_argument(
+        '--data-bundle', action='store_true',
+        help='write the leaderboard and race tables as JSON under docs/data, loaded and paged in the browser')
+    parser.add_argument(
+        '--profile', nargs='?', type=Path, const=Path('build_profile.json'), default=None, metavar='REPORT',
+        help='record stage, race and page timings and write them as JSON (default: build_profile.json)')
+    parser.add_argument(
+        '--profile-dump', type=Path, default=None,
+        help='also run the build under cProfile and dump the stats to this file')
+    parser.add_argument(
+        '--serve', action='store_true',
+        help='rather than writing docs/, serve a live preview, rendering pages on request and reloading when inputs change')
+    parser.add_argument(
+        '--port', type=int, default=8000, help='port for --serve (default: 8000)')
+    parser.add_argument(
+        '--watch', action='store_true',
+        help='build, then keep watching the input files and rebuild only what changed files affect')
+    parser.add_argument(
+        '--debounce', type=float, default=2.0,
+        help='with --watch, seconds to wait for files to stop changing before rebuilding (default: 2)')
+    parser.add_argument(
+        '--league', nargs='?', type=Path, const=Path('clubs.csv'), default=None, metavar='CLUBS',
+        help='build every club in a club list (default: clubs.csv) as its own site, --jobs clubs at a time, '
+        'and add league 5k and marathon leaderboards merged across the clubs to each one')
+    args = parser.parse_args()
+    if args.league is not None and (
+        args.serve or args.watch or args.profile is not None or args.profile_dump is not None):
+        parser.error('--league can\'t be used with --serve, --watch, --profile or --profile-dump')
+    return args
 
 if __name__ == "__main__":
+    #Only the standard library is imported until the arguments are parsed, so --help and
+    #bad arguments return straight away, and each mode only imports what it runs
+    args = parse_args()
+    #Relative paths are relative to each club's directory in league mode
+    processor_args = dict(
+        store_path = args.store if args.incremental else None,
+        signatures_path = None if args.all_pages else Path('.page_signatures.json'),
+        factor_cache_path = args.factor_cache,
+        archive_path = args.archive,
+        simulations = args.simulate,
+        data_bundle = args.data_bundle,
+    )
+
+    if args.league is not None:
+        from src.league import League
+        League(args.league, jobs=args.jobs, processor_args=processor_args).process_league()
+        raise SystemExit()
+
+    from src.profiling import Profiler
+    from src.race_processor import RaceProcessor
+
     rp = RaceProcessor(
         athlete_list_path = Path('athletes_list.csv'),
-        race_list_path = Path('race_list.csv')
+        race_list_path = Path('race_list.csv'),
+        jobs = args.jobs,
+        profiler = Profiler(enabled=args.profile is not None),
+        **processor_args
     )
     
-    rp.process_races()
+    if args.serve:
+        from src.preview_server import PreviewServer
+        PreviewServer(rp, port=args.port).serve()
+    elif args.watch:
+        from src.watcher import Watcher
+        Watcher(rp, debounce=args.debounce).run()
+    elif args.profile_dump is not None:
+        import cProfile
+        cProfile.run('rp.process_races()', str(args.profile_dump))
+    else:
+        rp.process_races()
+
+    if args.profile is not None:
+        rp.profiler.write_report(args.profile, rp.profile_report())
+        print(f'Profile written to {args.profile}')
@@ -2,13 +2,19 @@
 
 Usage:
     python hale_script.py --pdf /path/to/Hale10k_results.pdf --out altrincham_hale.csv
+    python hale_script.py --pdf /path/to/pdf_folder --out /path/to/csv_folder --jobs 4
 
 Dependencies:
     pip install pdfplumber
 
-The script searches for lines containing 'Altrincham' (case-insensitive), then
-attempts to extract a chip time and a reasonably-formed athlete name. The
-output is a CSV with two columns (no header): name,chip_time
+Each line of the results is matched once against a pattern for the results layout
+(place, bib, name, gender and age group positions, club, chip time, ...), keeping lines
+where the club starts with 'Altrincham' (case-insensitive). Pages are streamed from the
+PDF one at a time, or spread over a process pool with --jobs, and rows are written as
+each page is done. Names are matched to athletes_list.csv and races/aliases.csv with the
+shared name resolver, and any that weren't exact matches are listed at the end. Suggested
+matches for typos are written as they appear in the PDF, and are only scored once they're
+added to the alias table. The output is a CSV with two columns (no header): name,chip_time
 """
 from __future__ import annotations
 
@@ -16,7 +22,11 @@ import argparse
 import csv
 import re
 import sys
-from typing import List, Optional, Tuple
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
 
 try:
     import pdfplumber
@@ -25,90 +35,160 @@ except Exception as e:  # pragma: no cover - runtime dependency
         "pdfplumber is required. Install with: pip install pdfplumber"
     ) from e
 
+# So the name resolver can be shared with the other importers
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+from src.name_resolver import ALIASES_PATH, NameResolver, load_aliases  # noqa: E402
 
-TIME_RE = re.compile(r"\b\d{1,2}:\d{2}:\d{2}\b|\b\d{1,2}:\d{2}\b")
-CLUB_RE = re.compile(r"altrincham", re.I)
-NAME_RE = re.compile(r"[A-Z][a-z\-']+(?: [A-Z][a-z\-']+){0,4}")
 
+LINE_RE = re.compile(
+    r"^\d+\.?\s+"  # place
+    r"\d+\s+"  # bib
+    r"(?P<name>\D+?)\s+"  # name, up to the first position
+    r"(?:\d+/\d+\([^)]*\)\s+){0,2}"  # gender and age group positions, eg 21/1004(M) 5/123(M40+)
+    r"altrincham\D*?\s+"  # club
+    r"(?P<chip>\d{1,2}:\d{2}(?::\d{2})?)\b",  # chip time
+    re.I,
+)
+# Pages per task when using a process pool, small enough to keep the workers balanced
+PAGES_PER_TASK = 4
 
-def extract_lines_from_pdf(path: str) -> List[str]:
-    lines: List[str] = []
+
+class PageResult(NamedTuple):
+    page_number: int
+    rows: List[Tuple[str, str]]
+    seconds: float
+
+
+def iter_page_lines(
+    path: str, page_numbers: Optional[Sequence[int]] = None
+) -> Iterator[Tuple[int, List[str]]]:
+    """Yield (page number, non-empty lines) a page at a time (all pages by default),
+    opening the file once and releasing each page when done."""
     with pdfplumber.open(path) as pdf:
-        for page in pdf.pages:
+        if page_numbers is None:
+            page_numbers = range(len(pdf.pages))
+        for page_number in page_numbers:
+            page = pdf.pages[page_number]
             text = page.extract_text() or ""
-            for l in text.splitlines():
-                l = l.strip()
-                if l:
-                    lines.append(l)
-    return lines
+            page.close()
+            yield page_number, [l.strip() for l in text.splitlines() if l.strip()]
 
 
 def extract_name_and_time(line: str) -> Optional[Tuple[str, str]]:
-    if not CLUB_RE.search(line):
+    match = LINE_RE.match(line)
+    if match is None:
         return None
-    
-    time_start_idx = line.find('AC')+3
-    chip_time = line[time_start_idx:time_start_idx+5]
-
-    # find the club match index and consider the left side of the line first
-    club_m = CLUB_RE.search(line)
-    club_idx = club_m.start() if club_m else len(line)
-    left = line[:club_idx]
-
-    # remove times and obvious bib/placings from the left part
-    left_clean = TIME_RE.sub("", left)
-    left_clean = re.sub(r"^\s*\d+[\).]?\s*", "", left_clean)  # leading bib/pos
-    left_clean = re.sub(r"\b\d{1,4}\b", "", left_clean)  # stray numbers
-    left_clean = re.sub(r"\s{2,}", " ", left_clean).strip()
-
-    # try to find name candidates on the cleaned left part
-    candidates = list(NAME_RE.finditer(left_clean))
-    if candidates:
-        # choose the candidate closest to the club (i.e., the last one)
-        name = candidates[-1].group(0)
-        return name, chip_time
-
-    # fallback: search whole line for a name-like token
-    candidates = list(NAME_RE.finditer(line))
-    if candidates:
-        # choose candidate nearest to the chip time if available
-        if chip_time:
-            chip_idx = line.rfind(chip_time)
-            best = min(candidates, key=lambda m: abs(m.start() - chip_idx))
-            return best.group(0), chip_time
-        return candidates[0].group(0), chip_time
-
-    return None
-
-
-def process(pdf_path: str, out_csv: str) -> None:
-    lines = extract_lines_from_pdf(pdf_path)
-    matches: List[Tuple[str, str]] = []
-    for ln in lines:
-        if CLUB_RE.search(ln):
-            res = extract_name_and_time(ln)
-            if res:
-                matches.append(res)
-
-    if not matches:
-        print("No Altrincham athletes found in the PDF (or parsing failed).")
+    return match.group("name"), match.group("chip")
+
+
+def iter_page_results(path: str, page_numbers: Optional[Sequence[int]] = None) -> Iterator[PageResult]:
+    start = time.perf_counter()
+    for page_number, lines in iter_page_lines(path, page_numbers):
+        rows = [res for res in map(extract_name_and_time, lines) if res]
+        end = time.perf_counter()
+        yield PageResult(page_number, rows, end - start)
+        start = end
+
+
+def process_pages(path: str, page_numbers: Sequence[int]) -> List[PageResult]:
+    """A pool task: a few pages, returned together."""
+    return list(iter_page_results(path, page_numbers))
+
+
+def iter_pdf_results(path: str, executor: Optional[Executor] = None) -> Iterator[PageResult]:
+    """Yield each page's club rows in page order, extracting pages in the pool if given."""
+    if executor is None:
+        yield from iter_page_results(path)
+        return
+
+    with pdfplumber.open(path) as pdf:
+        n_pages = len(pdf.pages)
+    tasks = [range(start, min(start + PAGES_PER_TASK, n_pages)) for start in range(0, n_pages, PAGES_PER_TASK)]
+    for results in executor.map(process_pages, repeat(path), tasks):
+        yield from results
+
+
+def process(
+    pdf_path: str,
+    out_csv: str,
+    executor: Optional[Executor] = None,
+    resolver: Optional[NameResolver] = None,
+    timing: bool = False,
+) -> int:
+    resolver = resolver or NameResolver([])
+    n_rows = 0
+    page_times: List[Tuple[int, float]] = []
+    start = time.perf_counter()
 
     # write CSV without header, one athlete per row: name,chip_time
     with open(out_csv, "w", newline="", encoding="utf-8") as fh:
         writer = csv.writer(fh)
-        for name, chip in matches:
-            writer.writerow([name, chip])
+        for page in iter_pdf_results(pdf_path, executor):
+            for name, chip in page.rows:
+                match = resolver.resolve(name)
+                if match.method != "dropped":
+                    writer.writerow([match.athlete if match.is_certain else name, chip])
+                    n_rows += 1
+            page_times.append((page.page_number, page.seconds))
+            if timing:
+                print(f"  page {page.page_number + 1}: {len(page.rows)} rows in {page.seconds:.3f}s")
+
+    if not n_rows:
+        print("No Altrincham athletes found in the PDF (or parsing failed).")
 
-    print(f"Wrote {len(matches)} rows to {out_csv}")
+    slowest_page, slowest_time = max(page_times, key=lambda p: p[1], default=(0, 0.0))
+    print(
+        f"Wrote {n_rows} rows to {out_csv} from {len(page_times)} pages in "
+        f"{time.perf_counter() - start:.2f}s (slowest page {slowest_page + 1}: {slowest_time:.3f}s)"
+    )
+    return n_rows
 
 
 def main(argv: Optional[List[str]] = None) -> int:
     p = argparse.ArgumentParser(description="Extract Altrincham athletes from a Hale10k PDF")
-    p.add_argument("--pdf", required=True, help="Path to Hale10k_results.pdf")
-    p.add_argument("--out", default="altrincham_hale.csv", help="Output CSV file")
+    p.add_argument("--pdf", required=True, help="Path to Hale10k_results.pdf, or a folder of PDFs")
+    p.add_argument(
+        "--out", default="altrincham_hale.csv", help="Output CSV file, or folder when --pdf is a folder"
+    )
+    p.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes to extract pages with")
+    p.add_argument("--aliases", default=str(REPO_ROOT / ALIASES_PATH), help="Name alias table")
+    p.add_argument(
+        "--athletes", default=str(REPO_ROOT / "athletes_list.csv"), help="Athlete list to match names against"
+    )
+    p.add_argument("--timing", action="store_true", help="Report the time taken for each page")
     args = p.parse_args(argv)
 
-    process(args.pdf, args.out)
+    pdf_path = Path(args.pdf)
+    if pdf_path.is_dir():
+        out_dir = Path(args.out)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        files = [(str(path), str(out_dir / f"{path.stem}_results.csv")) for path in sorted(pdf_path.glob("*.pdf"))]
+    else:
+        files = [(args.pdf, args.out)]
+
+    if Path(args.athletes).exists():
+        resolver = NameResolver.from_athlete_list(Path(args.athletes), Path(args.aliases))
+    else:
+        print(f"{args.athletes} not found, only the alias table will be used to match names")
+        resolver = NameResolver([], load_aliases(Path(args.aliases)))
+    executor = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else None
+    try:
+        for pdf, out_csv in files:
+            process(pdf, out_csv, executor, resolver, args.timing)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    for match in resolver.report():
+        athlete = f" -> {match.athlete}" if match.athlete else ""
+        candidates = f" (could be {', '.join(match.candidates)})" if match.candidates else ""
+        suggestion = (
+            f', kept as written: if right add "{match.name},{match.athlete}" to the alias table'
+            if match.athlete and not match.is_certain
+            else ""
+        )
+        print(f"{match.name}: {match.method}{athlete}{candidates}{suggestion}")
     return 0
 
 
@@ -1,30 +1,67 @@
+'''
+Filter a results CSV downloaded from nifty (or any results file with name, time and club
+columns) down to the club's runners, in the race CSV format used in races/.
+
+Run from the repo root, for a single file or a whole folder of downloads:
+
+    python races/nifty/nifty_parser.py <results.csv> <output.csv>
+    python races/nifty/nifty_parser.py races/nifty races --jobs 4
+
+Names are matched to athletes_list.csv (allowing for nicknames, accents, 'SURNAME, First'
+ordering and small typos) and races/aliases.csv. Any name that wasn't an exact match is
+listed at the end so it can be checked. Suggested matches for typos are written as they
+appear in the results, and are only scored once they're added to the alias table
+'''
+import argparse
 import sys
-import numpy as np
-
-input_path = sys.argv[1]
-output_path = sys.argv[2]
-club_col = int(sys.argv[3])
-
-all_data = np.loadtxt(input_path, delimiter=',', dtype=str, skiprows=1)
-
-first_name_col = 3
-last_name_col = 4
-time_col = 5
-
-with open(output_path, 'wt') as f:
-    for row in all_data[1:,:]:
-        if len(row) < club_col + 1:
-            continue
-        if row[club_col].lower().startswith('altrincham') and row[time_col]:
-            name = f'{row[first_name_col]} {row[last_name_col]}'
-            
-            #Deal with custom overrides
-            if name == 'Andy Pickford':
-                name = 'Andrew Pickford'
-            if name == 'Rich Hill':
-                name = 'Richard Hill'
-            elif name == 'Kieran McGlade':
-                continue
-
-            print(f'{name}, {row[time_col]}')
-            print(f'{name}, {row[time_col]}', file=f)
+from pathlib import Path
+
+#So the script can still be run directly, rather than as a module
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.name_resolver import ALIASES_PATH, NameResolver, load_aliases
+from src.results_importer import CLUB_NAMES, club_matcher, import_directory, import_results
+
+ATHLETE_LIST_PATH = Path('athletes_list.csv')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', type=Path, help='results CSV, or a folder of them')
+    parser.add_argument('output', type=Path, help='race CSV to write, or a folder to write them to')
+    parser.add_argument(
+        'club_col', nargs='?', type=int, default=None,
+        help='ignored, the club column is now found from the header row')
+    parser.add_argument(
+        '--club', action='append', default=None,
+        help=f'club name the club column must start with, can be repeated (default: {", ".join(CLUB_NAMES)})')
+    parser.add_argument(
+        '--aliases', type=Path, default=ALIASES_PATH, help=f'name alias table (default: {ALIASES_PATH})')
+    parser.add_argument(
+        '--athletes', type=Path, default=ATHLETE_LIST_PATH,
+        help=f'athlete list to match names against (default: {ATHLETE_LIST_PATH})')
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=1, help='worker processes for importing a folder (default: 1)')
+    args = parser.parse_args()
+
+    matcher = club_matcher(args.club or CLUB_NAMES)
+    if args.athletes.exists():
+        resolver = NameResolver.from_athlete_list(args.athletes, args.aliases)
+    else:
+        print(f'{args.athletes} not found, only the alias table will be used to match names')
+        resolver = NameResolver([], load_aliases(args.aliases))
+    if args.input.is_dir():
+        results = import_directory(args.input, args.output, matcher, resolver, args.jobs)
+    else:
+        results = [import_results(args.input, args.output, matcher, resolver)]
+
+    for result in results:
+        print(f'{result.input_path} -> {result.output_path}: {result.n_runners} runners')
+    to_check = {
+        match for result in results for match in result.matches if match.method not in ('alias', 'dropped')}
+    for match in sorted(to_check):
+        athlete = f' -> {match.athlete}' if match.athlete else ''
+        candidates = f' (could be {", ".join(match.candidates)})' if match.candidates else ''
+        suggestion = (
+            f', kept as written: if right add "{match.name},{match.athlete}" to the alias table'
+            if match.athlete and not match.is_certain else '')
+        print(f'{match.name}: {match.method}{athlete}{candidates}{suggestion}')
@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+import heapq
 from datetime import date
 from pathlib import Path
 
@@ -7,7 +8,24 @@ from src.utils import years_since
 
 TOTAL_RACES = 6
 
-@dataclass
+def age_category(age:int)->str:
+    if age < 17:
+        return 'U17'
+    elif age < 20:
+        return 'U20'
+    elif age < 35:
+        return 'Senior'
+    else:
+        return f'V{5 * (age // 5)}'
+
+def category_order(category:str)->int:
+    #Youngest first: U17, U20, Senior, then the veteran categories by age
+    junior_senior = ['U17', 'U20', 'Senior']
+    if category in junior_senior:
+        return junior_senior.index(category)
+    return len(junior_senior) + int(category[1:])
+
+@dataclass(slots=True)
 class Athlete:
     name:str
     dob:date
@@ -16,35 +34,14 @@ class Athlete:
     best_5k:RaceEntry = None # type: ignore
     best_marathon:RaceEntry = None # type: ignore
     counting_races:list[RaceEntry] = field(default_factory=list)
+    club_races:list[RaceEntry] = field(default_factory=list, init=False, repr=False)
+    _5k_races:list[RaceEntry] = field(default_factory=list, init=False, repr=False)
+    marathons:list[RaceEntry] = field(default_factory=list, init=False, repr=False)
+    current_category:str = field(default=None, init=False, repr=False) #type: ignore
 
     def __post_init__(self):
-        if self.best_5k is None:
-            self.best_5k = RaceEntry(
-                athlete=self.name,
-                race_name='',
-                race_date=date.today(),
-                time=int(1e6),
-                distance=5,
-                male=self.male,
-                is_5k=True,
-                is_marathon=False,
-                time_score=0,
-                age_pct=0,
-                age_pct_score=0)
-            
-        if self.best_marathon is None:
-            self.best_marathon = RaceEntry(
-                athlete=self.name,
-                race_name='',
-                race_date=date.today(),
-                time=int(1e6),
-                distance=0,
-                male=self.male,
-                is_5k=False,
-                is_marathon=True,
-                time_score=0,
-                age_pct=0,
-                age_pct_score=0)
+        for race in self.races:
+            self._add_to_race_lists(race)
         
     @property
     def summary_page(self)->Path:
@@ -53,45 +50,43 @@ class Athlete:
         return athletes_dir / f'{athlete_name.lower()}_summary.html'
 
     @property
-    def age_category(self):
-        age = years_since(self.dob)
-        if age < 17:
-            return 'U17'
-        elif age < 20:
-            return 'U20'
-        elif age < 35:
-            return 'Senior'
-        else:
-            return f'V{5 * (age // 5)}'
-            
+    def age_category(self)->str:
+        #Set from the season calendar when the league is loaded
+        if self.current_category is not None:
+            return self.current_category
+        return age_category(years_since(self.dob))
+
 
     @property
-    def club_races(self)->list[RaceEntry]:
-        return [race for race in self.races if race.is_club]
-    
-    @property
-    def _5k_races(self)->list[RaceEntry]:
-        return [race for race in self.races if race.is_5k]
-    
-    @property
-    def marathons(self)->list[RaceEntry]:
-        return [race for race in self.races if race.is_marathon]
-    
-    @property
-    def required_races(self):
-        if self.best_5k.total_score > self.best_marathon.total_score:
+    def required_races(self)->tuple[RaceEntry,RaceEntry]:
+        #The best scoring of the combined 5k and marathon first (the marathon on a tie),
+        #followed by the other. One not yet run is None and scores 0, so a lone 5k that
+        #scored 0 comes second, and only counts if it makes the club races
+        score_5k = self.best_5k.total_score if self.best_5k is not None else 0
+        score_marathon = self.best_marathon.total_score if self.best_marathon is not None else 0
+        if score_5k > score_marathon:
             return self.best_5k, self.best_marathon
         else:
-            return self.best_marathon, self.best_5k 
+            return self.best_marathon, self.best_5k
 
-    def add_race(self, race:RaceEntry):
+    def _add_to_race_lists(self, race:RaceEntry):
+        if race.is_club:
+            self.club_races.append(race)
+        if race.is_5k:
+            self._5k_races.append(race)
+        if race.is_marathon:
+            self.marathons.append(race)
+
+    def add_race(self, race:RaceEntry, age_grade:bool=True):
 
         if race.athlete != self.name:
             raise ValueError(f'Race name ({race.athlete}) does not match athlete name ({self.name})')
         
-        race.compute_age_pct(self.dob)
+        if age_grade:
+            race.compute_age_pct(self.dob)
 
         self.races.append(race)
+        self._add_to_race_lists(race)
 
         if race.is_5k and (self.best_5k is None or (race.time < self.best_5k.time)):
             self.best_5k = race
@@ -99,6 +94,34 @@ class Athlete:
         if race.is_marathon and (self.best_marathon is None or (race.time < self.best_marathon.time)):
             self.best_marathon = race
 
+    def remove_race(self, race:RaceEntry):
+        #Entries are matched by identity, as two entries can compare equal field by field
+        self.races = [r for r in self.races if r is not race]
+        self.club_races = [r for r in self.club_races if r is not race]
+        self._5k_races = [r for r in self._5k_races if r is not race]
+        self.marathons = [r for r in self.marathons if r is not race]
+        self.counting_races = [r for r in self.counting_races if r is not race]
+        race.counting = False
+        self._update_bests()
+
+    def sort_races(self, race_order:dict[str,int]):
+        #Put the races back in race list order (eg after one has been reloaded), so
+        #everything matches a full load, including which of two equal times is best
+        for races in (self.races, self.club_races, self._5k_races, self.marathons):
+            races.sort(key=lambda race:race_order[race.race_name])
+        self._update_bests()
+
+    def _update_bests(self):
+        self.best_5k = None # type: ignore
+        for race in self._5k_races:
+            if self.best_5k is None or race.time < self.best_5k.time:
+                self.best_5k = race
+
+        self.best_marathon = None # type: ignore
+        for race in self.marathons:
+            if self.best_marathon is None or race.time < self.best_marathon.time:
+                self.best_marathon = race
+
     @property
     def time_score(self):
         return sum(race.time_score for race in self.counting_races)
@@ -112,15 +135,19 @@ class Athlete:
         return sum(race.total_score for race in self.counting_races)
     
     def update_scores_lists(self):
+        for race in self.counting_races:
+            race.counting = False
+
         #Set the best counting of the combined 5k or marathon as the first counting
-        #race then add the worse of the two to the list of club races, then sort
-        #these by descending score
-        self.counting_races = [self.required_races[0]]
-        races_by_score = sorted(
-            self.club_races + [self.required_races[1]], key=lambda race:race.total_score, reverse=True)
-        
-        #Add up to the allowed number of races to the counters
-        self.counting_races += races_by_score[:TOTAL_RACES-1]
-        
-        #Remove dummy entries for the 5k or marathon (which have no name)
-        self.counting_races = [race for race in self.counting_races if race.race_name]
\ No newline at end of file
+        #race then add the worse of the two to the list of club races, then take the
+        #best scoring of these
+        first_race, second_race = self.required_races
+        self.counting_races = [first_race] if first_race is not None else []
+        #Add up to the allowed number of races to the counters, a heap capped at the
+        #number of races needed is cheaper than sorting every race (and picks the same races)
+        other_races = self.club_races + ([second_race] if second_race is not None else [])
+        self.counting_races += heapq.nlargest(TOTAL_RACES-1, other_races, key=lambda race:race.total_score)
+
+        #Flag the counting entries so membership is a simple attribute lookup
+        for race in self.counting_races:
+            race.counting = True
\ No newline at end of file
@@ -1,39 +1,80 @@
 from copy import copy
 from pathlib import Path
-from typing import Collection
 
 from src.athlete import Athlete
+from src.leaderboard import Leaderboard
 from src.race import Race
 from src.race_entry import RaceEntry
+from src.season_archive import AthleteHistory, ArchivedEntry, distance_label
 
 import src.html_pages as hp
-from src.utils import date_to_str, secs_to_time_str
+from src.page_writer import PageWriter
+from src.utils import date_to_str, season_label, secs_to_time_str
 
 class AthletePage:
 
+    @staticmethod
+    def positions(athlete:Athlete, leaderboard:Leaderboard)->list[str]:
+
+        def rank_str(rank_total:tuple[int,int]):
+            rank, total = rank_total
+            return f'{rank} out of {total}'
+
+        return [
+            rank_str(leaderboard.overall_rank(athlete)),
+            rank_str(leaderboard.gender_rank(athlete)),
+            rank_str(leaderboard.category_rank(athlete))]
+
+    @staticmethod
+    def dependencies(
+        athlete:Athlete,
+        positions:list[str],
+        all_races:dict[str,Race],
+        combined_5k_page:Path,
+        combined_marathon_page:Path,
+        history:AthleteHistory=None)->tuple: #type: ignore
+        #Everything displayed on the page, used to decide whether it needs rewriting
+        def entry_values(race_entry:RaceEntry):
+            race = all_races.get(race_entry.race_name)
+            return (
+                race_entry.race_name,
+                race.summary_page if race else None,
+                race_entry.race_date,
+                race_entry.time,
+                race_entry.age_pct,
+                race_entry.is_club,
+                race_entry.time_score,
+                race_entry.age_pct_score,
+                race_entry.counting)
+
+        return (
+            athlete.name,
+            athlete.male,
+            athlete.age_category,
+            athlete.time_score,
+            athlete.age_pct_score,
+            athlete.total_score,
+            tuple(positions),
+            tuple(entry_values(r) for r in athlete.races),
+            entry_values(athlete.best_5k) if athlete.best_5k else None,
+            entry_values(athlete.best_marathon) if athlete.best_marathon else None,
+            combined_5k_page,
+            combined_marathon_page,
+            tuple(history.entries) if history else None)
+
     @staticmethod
     def print_athlete_page(
         athlete:Athlete,
-        all_athletes:dict[str,Athlete],
+        leaderboard:Leaderboard,
         all_races:dict[str,Race],
         combined_5k_page:Path,
-        combined_marathon_page:Path):
-        
-        
-        def scored_more(other_athlete:Athlete):
-            return other_athlete.total_score > athlete.total_score
-        
-        def same_gender(other_athlete:Athlete):
-            return athlete.male == other_athlete.male
-        
-        def same_category(other_athlete:Athlete):
-            return athlete.age_category == other_athlete.age_category
-        
-        def rank_str(other_athletes:Collection[Athlete]):
-            total = len(other_athletes)
-            rank = sum(scored_more(a) for a in other_athletes)+1
-            return f'{rank} out of {total}'
+        combined_marathon_page:Path,
+        writer:PageWriter=None, #type: ignore
+        history:AthleteHistory=None): #type: ignore
         
+        if writer is None:
+            writer = PageWriter()
+
         def print_race_headers(is_club:bool, file_id):
             caption = "* denotes race contributes to athlete's total score"
             headers = ['Race', 'Date', 'Time', 'Age %']
@@ -41,9 +82,9 @@ class AthletePage:
                 headers += ['Time score', 'Age % score', 'Race score']
             hp.html_start_table(headers, file_id, caption=caption)
 
-        def print_race_summary(race_entry:RaceEntry, file_id):
+        def race_summary_cols(race_entry:RaceEntry)->list:
             race = all_races[race_entry.race_name]
-            counter = '*' if race_entry in athlete.counting_races else ''
+            counter = '*' if race_entry.counting else ''
             col_values = [
                 hp.html_link(race_entry.race_name+counter, Path('..')/race.summary_page),
                 date_to_str(race_entry.race_date),
@@ -56,11 +97,11 @@ class AthletePage:
                 race_entry.age_pct_score,
                 race_entry.total_score
                 ]
-            hp.html_table_row(col_values, file_id)
+            return col_values
 
         def print_combined_race_summary(race_entry:RaceEntry, title:str, link:Path, file_id):
             
-            counter = '*' if race_entry in athlete.counting_races else ''
+            counter = '*' if race_entry.counting else ''
             col_values = [
                 hp.html_link(title+counter, Path('..')/link),
                 date_to_str(race_entry.race_date),
@@ -76,17 +117,16 @@ class AthletePage:
         def print_race_list(is_club_table:bool, races:list[RaceEntry], file_id):
             n_races = len(races)
             if is_club_table:
-                n_races += bool(athlete.best_5k.race_name) + bool(athlete.best_marathon.race_name)
+                n_races += (athlete.best_5k is not None) + (athlete.best_marathon is not None)
 
             if n_races:    
                 print_race_headers(is_club_table, file_id)
-                for race in races:
-                    print_race_summary(race, file_id)
+                hp.html_table_rows([race_summary_cols(race) for race in races], file_id)
 
                 if is_club_table:
-                    if athlete.best_5k.race_name:
+                    if athlete.best_5k is not None:
                         print_combined_race_summary(athlete.best_5k, 'Best 5k', combined_5k_page, file_id)
-                    if athlete.best_marathon.race_name:
+                    if athlete.best_marathon is not None:
                         print_combined_race_summary(athlete.best_marathon, 'Marathon', combined_marathon_page, file_id)
 
                     totals_cols = [
@@ -102,22 +142,26 @@ class AthletePage:
 
                 hp.html_end_table(file=file_id)
             else:
-                print('None', file=file_id)
+                file_id.write('None\n')
 
         gender = 'male' if athlete.male else 'female'
-        matched_gender_athletes = [a for a in all_athletes.values() if same_gender(a)]
-        matched_category_athletes = [a for a in matched_gender_athletes if same_category(a)]
+        overall_position, gender_position, category_position = AthletePage.positions(athlete, leaderboard)
+        dependencies = AthletePage.dependencies(
+            athlete, [overall_position, gender_position, category_position],
+            all_races, combined_5k_page, combined_marathon_page, history)
+        if not writer.needs_update(athlete.summary_page, dependencies):
+            return
 
-        with athlete.summary_page.open('wt') as file_id:
+        with writer.open(athlete.summary_page) as file_id:
             hp.html_header(athlete.name, '../css/styles.css', file_id)
             hp.html_h(f'{athlete.name}', 1, file=file_id)
             hp.html_list(
             [
             f'Category: {athlete.age_category} {gender}',
             f'Total score: {athlete.total_score}',
-            f'Overall position: {rank_str(all_athletes.values())}',
-            f'Gender position: {rank_str(matched_gender_athletes)}',
-            f'Category position: {rank_str(matched_category_athletes)}'], file=file_id)
+            f'Overall position: {overall_position}',
+            f'Gender position: {gender_position}',
+            f'Category position: {category_position}'], file=file_id)
 
             hp.html_h('Club races', 2, file=file_id)
             print_race_list(True, athlete.club_races, file_id)
@@ -143,5 +187,43 @@ class AthletePage:
                     'a single race.', file_id
                     )
             print_race_list(False, athlete.marathons, file_id)
+            if history is not None:
+                AthletePage.print_history(history, file_id)
             hp.html_p(hp.html_link('<br><br>Home', Path('../index.html')), file=file_id)
             hp.html_footer(file_id, '')
+
+    @staticmethod
+    def print_history(history:AthleteHistory, file_id):
+
+        def entry_cols(entry:ArchivedEntry)->list:
+            return [
+                entry.race_name,
+                date_to_str(entry.race_date),
+                distance_label(entry.distance),
+                secs_to_time_str(entry.time),
+                f'{entry.age_pct:3.2f}']
+
+        def previous_entry_cols(entry:ArchivedEntry)->list:
+            counter = '*' if entry.counting else ''
+            race_name, *cols = entry_cols(entry)
+            return [race_name+counter, *cols, season_label(entry.season), entry.total_score]
+
+        hp.html_h('Season totals', 2, file=file_id)
+        hp.html_start_table(['Season', 'Races', 'Total score'], file_id)
+        hp.html_table_rows(
+            [[season_label(season), n_races, total] for season, n_races, total in history.season_totals()], file_id)
+        hp.html_end_table(file=file_id)
+
+        hp.html_h('Personal bests', 2, file=file_id)
+        hp.html_start_table(['Race', 'Date', 'Distance', 'Time', 'Age %'], file_id)
+        hp.html_table_rows([entry_cols(entry) for entry in history.personal_bests()], file_id)
+        hp.html_end_table(file=file_id)
+
+        previous_entries = history.previous_entries()
+        if previous_entries:
+            hp.html_h('Previous seasons', 2, file=file_id)
+            caption = "* denotes race contributed to athlete's total score"
+            hp.html_start_table(
+                ['Race', 'Date', 'Distance', 'Time', 'Age %', 'Season', 'Race score'], file_id, caption=caption)
+            hp.html_table_rows([previous_entry_cols(entry) for entry in reversed(previous_entries)], file_id)
+            hp.html_end_table(file=file_id)
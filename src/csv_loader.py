@@ -0,0 +1,90 @@
+import csv
+from datetime import date
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+from src.utils import date_from_str, distance_in_kms, time_str_to_secs
+
+class AthleteRow(NamedTuple):
+    first_name:str
+    last_name:str
+    male:bool
+    dob:date
+
+class RaceListRow(NamedTuple):
+    name:str
+    distance:float
+    race_date:date
+    is_5k:bool
+    is_marathon:bool
+    filepath:Path
+
+class ResultRow(NamedTuple):
+    name:str
+    time:int
+
+class AliasRow(NamedTuple):
+    results_name:str
+    athlete_name:str
+
+class ClubRow(NamedTuple):
+    name:str
+    directory:Path
+
+def iter_rows(path:Path, skip_rows:int=0)->Iterator[tuple[int,list[str]]]:
+    #Stream (line number, fields) from a CSV file, stripping whitespace around fields
+    #and skipping blank lines and lines commented out with '#'
+    with open(path, newline='', encoding='utf-8-sig') as file_id:
+        reader = csv.reader(file_id, skipinitialspace=True)
+        for row in reader:
+            line_no = reader.line_num
+            if line_no <= skip_rows:
+                continue
+            fields = [field.strip() for field in row]
+            if not any(fields) or fields[0].startswith('#'):
+                continue
+            yield line_no, fields
+
+def _load_rows(path:Path, n_cols:int, parse_row, skip_rows:int=0)->list:
+    #Parse every row, collecting errors so all bad lines in a file are reported at once
+    rows = []
+    errors = []
+    for line_no, fields in iter_rows(path, skip_rows):
+        if len(fields) != n_cols:
+            errors.append(f'{path}:{line_no}: expected {n_cols} columns, found {len(fields)}')
+            continue
+        try:
+            rows.append(parse_row(*fields))
+        except ValueError as e:
+            errors.append(f'{path}:{line_no}: {e}')
+    if errors:
+        raise ValueError('\n'.join(errors))
+    return rows
+
+def load_athlete_list(path:Path)->list[AthleteRow]:
+    def parse_row(first_name, last_name, gender, dob):
+        return AthleteRow(first_name, last_name, gender.lower()=='male', date_from_str(dob))
+    return _load_rows(path, 4, parse_row)
+
+def load_race_list(path:Path)->list[RaceListRow]:
+    def parse_row(name, distance, race_date, is_5k, is_marathon, filepath):
+        return RaceListRow(
+            name, distance_in_kms(distance), date_from_str(race_date),
+            bool(int(is_5k)), bool(int(is_marathon)), Path(filepath))
+    return _load_rows(path, 6, parse_row, skip_rows=1)
+
+def load_race_results(path:Path)->list[ResultRow]:
+    def parse_row(name, race_time):
+        return ResultRow(name, time_str_to_secs(race_time))
+    return _load_rows(path, 2, parse_row)
+
+def load_alias_list(path:Path)->list[AliasRow]:
+    def parse_row(results_name, athlete_name):
+        return AliasRow(results_name, athlete_name)
+    return _load_rows(path, 2, parse_row, skip_rows=1)
+
+def load_club_list(path:Path)->list[ClubRow]:
+    #Club directories are relative to the club list
+    def parse_row(name, directory):
+        return ClubRow(name, path.parent / directory)
+    return _load_rows(path, 2, parse_row, skip_rows=1)
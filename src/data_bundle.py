@@ -0,0 +1,163 @@
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.athlete import Athlete, category_order
+from src.leaderboard import Leaderboard
+from src.race import Race
+from src.race_entry import RaceEntry
+
+import src.html_pages as hp
+from src.page_writer import PageWriter
+from src.utils import date_to_str, secs_to_time_str
+
+DOCS_DIR = Path() / 'docs'
+DATA_DIR = DOCS_DIR / 'data'
+GENDERS = ['F', 'M']
+COUNTING_CAPTION = "* denotes race contributes to athlete's total score"
+#Rows in the first page of a table, which is all a page loads until it's sorted,
+#filtered or paged through
+DATA_PAGE_SIZE = 50
+
+def data_path(page:Path)->Path:
+    #The data file behind a page, eg docs/races/x_summary.html -> docs/data/races/x_summary.json
+    return DATA_DIR / page.relative_to(DOCS_DIR).with_suffix('.json')
+
+def full_data_path(page:Path)->Path:
+    #The whole table, for a table too long for its first page, eg docs/data/races/x_summary_all.json
+    path = data_path(page)
+    return path.with_name(f'{path.stem}_all.json')
+
+@dataclass
+class DataTable:
+    #A table as compact JSON: links as [text, href], gender and category as indexes into
+    #their label lists, and for each column the row order that sorts it ascending
+    headers:list[str]
+    categories:list[str]
+    caption:str = ''
+    rows:list[list] = field(default_factory=list)
+    sort_keys:list[tuple] = field(default_factory=list)
+
+    def add_row(self, cells:list, sort_keys:tuple):
+        self.rows.append(cells)
+        self.sort_keys.append(sort_keys)
+
+    @property
+    def is_paged(self)->bool:
+        return len(self.rows) > DATA_PAGE_SIZE
+
+    def to_json(self, all_src:str=None)->str: #type: ignore
+        #The whole table, or with all_src (the name of the whole table's file) just its
+        #first page of rows in the order written
+        table = {
+            'headers': self.headers,
+            'caption': self.caption,
+            'codes': {'1': GENDERS, '2': self.categories},
+            'page_size': DATA_PAGE_SIZE,
+            'n_rows': len(self.rows),
+        }
+        if all_src is not None:
+            table.update({'rows': self.rows[:DATA_PAGE_SIZE], 'all': all_src})
+        else:
+            row_ids = range(len(self.rows))
+            table.update({
+                'rows': self.rows,
+                'orders': [
+                    sorted(row_ids, key=lambda i_row:self.sort_keys[i_row][i_col])
+                    for i_col in range(len(self.headers))]})
+        return json.dumps(table, separators=(',', ':'))
+
+@dataclass
+class DataBundle:
+    #The data for every leaderboard and race table, built in one pass over the scored league
+    tables:dict[str,DataTable] = field(default_factory=dict)
+
+    @staticmethod
+    def from_league(
+        index_page:Path, athletes:dict[str,Athlete], races:dict[str,Race], combined_races:list[Race],
+        leaderboard:Leaderboard)->'DataBundle':
+
+        categories = sorted(set(leaderboard.categories.values()), key=category_order)
+        category_codes = {category: i_category for i_category, category in enumerate(categories)}
+
+        def athlete_cells(name:str, counter:str, link_root:Path)->tuple[list,tuple]:
+            athlete = athletes[name]
+            category = leaderboard.categories[name]
+            cells = [
+                [name+counter, hp.web_link(link_root/athlete.summary_page)],
+                int(athlete.male),
+                category_codes[category]]
+            return cells, (name, athlete.male, category_order(category))
+
+        def result_cells(race_entry:RaceEntry)->tuple[list,tuple]:
+            age_pct_key = race_entry.age_pct if race_entry.age_pct == race_entry.age_pct else -1.0
+            return (
+                [secs_to_time_str(race_entry.time), f'{race_entry.age_pct:3.2f}'],
+                (race_entry.time, age_pct_key))
+
+        def score_cells(race_entry:RaceEntry)->tuple[list,tuple]:
+            scores = (race_entry.time_score, race_entry.age_pct_score, race_entry.total_score)
+            return list(scores), scores
+
+        bundle = DataBundle()
+        overall = DataTable(
+            ['Athlete', 'Gender  ', 'Category  ', 'Num. races', 'Time score', 'Age % score', 'Total score'], categories)
+        for athlete in sorted(athletes.values(), key=lambda a:(a.total_score, not a.male), reverse=True):
+            if not athlete.counting_races:
+                continue
+            cells, keys = athlete_cells(athlete.name, '', Path())
+            scores = (len(athlete.counting_races), athlete.time_score, athlete.age_pct_score, athlete.total_score)
+            overall.add_row(cells + list(scores), keys + scores)
+        bundle.tables[index_page.as_posix()] = overall
+
+        for race in races.values():
+            if not race.in_past:
+                continue
+            headers = ['Athlete', 'Gender  ', 'Category  ', 'Time', 'Age %']
+            if not (race.is_5k or race.is_marathon):
+                headers += ['Time score', 'Age % score', 'Race score']
+            table = DataTable(headers, categories, COUNTING_CAPTION)
+            for race_entry in sorted(race.athletes, key=lambda r:r.time):
+                cells, keys = athlete_cells(race_entry.athlete, '*' if race_entry.counting else '', Path('..'))
+                results, result_keys = result_cells(race_entry)
+                cells, keys = cells + results, keys + result_keys
+                if not (race.is_5k or race.is_marathon):
+                    scores, score_keys = score_cells(race_entry)
+                    cells, keys = cells + scores, keys + score_keys
+                table.add_row(cells, keys)
+            bundle.tables[race.summary_page.as_posix()] = table
+
+        for combined in combined_races:
+            table = DataTable(
+                ['Athlete', 'Gender  ', 'Category  ', 'Race', 'Date', 'Time', 'Age %', 'Time score', 'Age % score',
+                 'Race score'],
+                categories, COUNTING_CAPTION)
+            for race_entry in sorted(combined.athletes, key=lambda r:r.time):
+                if not race_entry.race_name:
+                    continue
+                cells, keys = athlete_cells(race_entry.athlete, '*' if race_entry.counting else '', Path('..'))
+                race = races[race_entry.race_name]
+                cells += [
+                    [race.name, hp.web_link(Path('..')/race.summary_page)], date_to_str(race_entry.race_date)]
+                keys += (race.name, race_entry.race_date)
+                results, result_keys = result_cells(race_entry)
+                scores, score_keys = score_cells(race_entry)
+                table.add_row(cells + results + scores, keys + result_keys + score_keys)
+            bundle.tables[combined.summary_page.as_posix()] = table
+        return bundle
+
+    def has_table(self, page:Path)->bool:
+        return page.as_posix() in self.tables
+
+    def paged_tables(self)->list[str]:
+        return [page for page, table in self.tables.items() if table.is_paged]
+
+    def write_table(self, page:str, writer:PageWriter):
+        #A long table's page loads its first page of rows, and only fetches the whole table
+        #when it's sorted, filtered or paged through
+        table = self.tables[page]
+        all_src = full_data_path(Path(page)).name if table.is_paged else None
+        writer.write(data_path(Path(page)), table.to_json(all_src))
+
+    def write_full_table(self, page:str, writer:PageWriter):
+        writer.write(full_data_path(Path(page)), self.tables[page].to_json())
@@ -0,0 +1,116 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from src.athlete import Athlete
+from src.race import Race
+
+ENTRY_DTYPE = np.dtype([
+    ('athlete', np.int32),
+    ('race', np.int32),
+    ('time', np.int32),
+    ('age_pct', np.float64),
+    ('time_score', np.int16),
+    ('age_pct_score', np.int16),
+    ('counting', np.bool_),
+])
+
+ATHLETE_DTYPE = np.dtype([
+    ('dob', 'datetime64[D]'),
+    ('male', np.bool_),
+])
+
+RACE_DTYPE = np.dtype([
+    ('race_date', 'datetime64[D]'),
+    ('distance', np.float64),
+    ('is_5k', np.bool_),
+    ('is_marathon', np.bool_),
+])
+
+def group_index(ids:np.ndarray, n_ids:int)->tuple[np.ndarray,np.ndarray]:
+    #The entry rows ordered by id (keeping their order within each id), and where each
+    #id's rows start and end in that order
+    order = np.argsort(ids, kind='stable')
+    bounds = np.searchsorted(ids[order], np.arange(n_ids + 1))
+    return order, bounds
+
+def group_entries(entries:np.ndarray, index:tuple[np.ndarray,np.ndarray], i_group:int)->np.ndarray:
+    order, bounds = index
+    return entries[order[bounds[i_group]:bounds[i_group+1]]]
+
+@dataclass(slots=True)
+class EntryTable:
+    #A compact, columnar copy of a season's scored results: one row per race entry,
+    #with athletes and races referred to by their index in the name lists. The entries
+    #are indexed by athlete and by race when the table is built or loaded, so looking
+    #up one athlete's or race's entries is a slice rather than a scan of the table
+    athlete_names:list[str]
+    race_names:list[str]
+    athlete_data:np.ndarray
+    race_data:np.ndarray
+    entries:np.ndarray
+    athlete_ids:dict[str,int] = field(init=False, repr=False)
+    race_ids:dict[str,int] = field(init=False, repr=False)
+    athlete_index:tuple[np.ndarray,np.ndarray] = field(init=False, repr=False)
+    race_index:tuple[np.ndarray,np.ndarray] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.athlete_ids = {name: i_athlete for i_athlete, name in enumerate(self.athlete_names)}
+        self.race_ids = {name: i_race for i_race, name in enumerate(self.race_names)}
+        self.athlete_index = group_index(self.entries['athlete'], len(self.athlete_names))
+        self.race_index = group_index(self.entries['race'], len(self.race_names))
+
+    @staticmethod
+    def from_races(athletes:dict[str,Athlete], races:Iterable[Race])->'EntryTable':
+        races = list(races)
+        athlete_names = list(athletes)
+        race_names = [race.name for race in races]
+        athlete_ids = {name: i_athlete for i_athlete, name in enumerate(athlete_names)}
+
+        athlete_data = np.array(
+            [(athlete.dob, athlete.male) for athlete in athletes.values()], dtype=ATHLETE_DTYPE)
+        race_data = np.array(
+            [(race.race_date, race.distance, race.is_5k, race.is_marathon) for race in races], dtype=RACE_DTYPE)
+
+        entries = np.array(
+            [
+                (athlete_ids[entry.athlete], i_race, entry.time, entry.age_pct,
+                 entry.time_score, entry.age_pct_score, entry.counting)
+                for i_race, race in enumerate(races) for entry in race.athletes
+            ],
+            dtype=ENTRY_DTYPE)
+        return EntryTable(athlete_names, race_names, athlete_data, race_data, entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def athlete_entries(self, name:str)->np.ndarray:
+        return group_entries(self.entries, self.athlete_index, self.athlete_ids[name])
+
+    def race_entries(self, name:str)->np.ndarray:
+        return group_entries(self.entries, self.race_index, self.race_ids[name])
+
+    @property
+    def nbytes(self)->int:
+        return self.athlete_data.nbytes + self.race_data.nbytes + self.entries.nbytes
+
+    def save(self, path:Path):
+        np.savez_compressed(
+            path,
+            athlete_names=np.array(self.athlete_names, dtype=str),
+            race_names=np.array(self.race_names, dtype=str),
+            athlete_data=self.athlete_data,
+            race_data=self.race_data,
+            entries=self.entries)
+
+    @staticmethod
+    def load(path:Path)->'EntryTable':
+        with np.load(path) as data:
+            return EntryTable(
+                data['athlete_names'].tolist(),
+                data['race_names'].tolist(),
+                data['athlete_data'],
+                data['race_data'],
+                data['entries'])
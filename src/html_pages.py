@@ -1,61 +1,79 @@
 from pathlib import Path
 
+#Each helper assembles its HTML into a single string and makes one write, the
+#pages themselves are rendered into an in-memory buffer (see PageWriter)
+HEADER_TEMPLATE = (
+    '<!DOCTYPE html>\n'
+    '<html lang="en">\n'
+    '<head>\n'
+    '  <meta charset="utf-8">\n'
+    '  <meta name="viewport" content="width=device-width, initial-scale=1, shrink-to-fit=no">\n'
+    '  <title>{title}</title>\n'
+    '  <link rel="stylesheet" type="text/css" href="{css}">\n'
+    '</head>\n'
+    '\n'
+    '<body>\n'
+    '\n'
+)
+
+FOOTER_TEMPLATE = (
+    '\n'
+    '  <script src="{script}"></script>\n'
+    '</body>\n'
+    '</html>\n'
+)
+
 def html_table_col(value, file):
-    print(f'    <td>{value}</td>', file=file)
+    file.write(f'    <td>{value}</td>\n')
+
+def table_row_str(values:list)->str:
+    cols = ''.join([f'    <td>{value}</td>\n' for value in values])
+    return f'<tr>\n{cols}</tr>\n'
 
 def html_table_row(values:list, file):
-    print('<tr>', file=file)
-    for value in values:
-        html_table_col(value, file=file)
-    print('</tr>', file=file)
+    file.write(table_row_str(values))
+
+def html_table_rows(rows:list[list], file):
+    file.write(''.join([table_row_str(values) for values in rows]))
 
 def html_start_table(headers:list, file, caption:str=''):
-    print('<table id="sortableTable">', file=file)
-    if caption:
-        print(f'<caption>{caption}</caption>', file=file)
-    print('<tr>', file=file)
-    for i_h,header in enumerate(headers):
-        print(f'    <th onclick="sortTable({i_h})">{header}</th>', file=file)
-    print('</tr>', file=file)
-    print('<tbody id="tableBody">', file=file)
+    caption_str = f'<caption>{caption}</caption>\n' if caption else ''
+    headers_str = ''.join(
+        [f'    <th onclick="sortTable({i_h})">{header}</th>\n' for i_h, header in enumerate(headers)])
+    file.write(
+        f'<table id="sortableTable">\n{caption_str}<tr>\n{headers_str}</tr>\n<tbody id="tableBody">\n')
 
 def html_end_table(file):
-    print('</tbody>', file=file)
-    print('</table>', file=file)
+    file.write('</tbody>\n</table>\n')
 
 def html_list(items:list, file):
-    print('<ul>', file=file)
-    for item in items:
-        print(f'    <li>{item}</li>', file=file)
-    print('</ul>', file=file)
+    items_str = ''.join([f'    <li>{item}</li>\n' for item in items])
+    file.write(f'<ul>\n{items_str}</ul>\n')
 
 def html_h(header:str, level:int, file):
-    print(f'<h{level}>{header}</h{level}>', file=file)
+    file.write(f'<h{level}>{header}</h{level}>\n')
 
 def html_p(text:str, file):
-    print(f'<p>{text}</p>', file=file)
+    file.write(f'<p>{text}</p>\n')
 
-def html_link(show_str:str, link:Path)->str:
+def web_link(link:Path)->str:
     web_link = link.as_posix().replace('docs/', '')
     if web_link.startswith('https:/'):
         web_link = web_link.replace('https:/', 'https://')
-    return f'<a href="{web_link}">{show_str}</a>'
+    return web_link
+
+def html_link(show_str:str, link:Path)->str:
+    return f'<a href="{web_link(link)}">{show_str}</a>'
+
+def html_data_table(src:Path, file):
+    #An empty table filled in by scripts/data_tables.js from the page's JSON data
+    file.write(
+        f'<div class="data-table" data-src="{web_link(src)}">\n'
+        '<noscript>This table needs JavaScript enabled</noscript>\n'
+        '</div>\n')
 
 def html_header(title:str, css, file_id):
-    print('<!DOCTYPE html>', file=file_id)
-    print('<html lang="en">', file=file_id)
-    print('<head>', file=file_id)
-    print('  <meta charset="utf-8">', file=file_id)
-    print('  <meta name="viewport" content="width=device-width, initial-scale=1, shrink-to-fit=no">', file=file_id)
-    print(f'  <title>{title}</title>', file=file_id)
-    print(f'  <link rel="stylesheet" type="text/css" href="{css}">', file=file_id)
-    print('</head>', file=file_id)
-    print('', file=file_id)
-    print('<body>', file=file_id)
-    print('', file=file_id)
+    file_id.write(HEADER_TEMPLATE.format(title=title, css=css))
 
 def html_footer(file_id, script):
-    print('', file=file_id)
-    print(f'  <script src="{script}"></script>', file=file_id)
-    print('</body>', file=file_id)
-    print('</html>', file=file_id)
\ No newline at end of file
+    file_id.write(FOOTER_TEMPLATE.format(script=script))
@@ -5,18 +5,60 @@ from src.athlete import Athlete
 from src.race import Race
 
 import src.html_pages as hp
+from src.league_page import LEAGUE_5K_PAGE, LEAGUE_MARATHON_PAGE
+from src.page_writer import PageWriter
+from src.records_page import CLUB_RECORDS_PAGE, PERSONAL_BESTS_PAGE
 from src.utils import date_to_str
 
 class IndexPage:
 
+    @staticmethod
+    def dependencies(
+        all_athletes:dict[str,Athlete], races:Collection[Race], combined_5k:Race, combined_marathon:Race,
+        projections_page:Path=None, league:bool=False)->tuple: #type: ignore
+        #Everything displayed on the page, used to decide whether it needs rewriting
+        return (
+            tuple(
+                (a.name, a.male, a.age_category, len(a.counting_races), a.time_score, a.age_pct_score, a.total_score)
+                for a in all_athletes.values() if a.counting_races),
+            tuple(
+                (r.name, r.race_date, r.is_5k, r.is_marathon, r.in_past, r.race_path, r.summary_page)
+                for r in races),
+            combined_5k.summary_page,
+            combined_marathon.summary_page,
+            projections_page,
+            league)
+
     @staticmethod
     def print_index_page(
-        page:Path, all_athletes:dict[str,Athlete], races:Collection[Race], combined_5k:Race, combined_marathon:Race):
-        with page.open('wt') as file_id:
+        page:Path, all_athletes:dict[str,Athlete], races:Collection[Race], combined_5k:Race, combined_marathon:Race,
+        writer:PageWriter=None, projections_page:Path=None, data_page:Path=None, league:bool=False): #type: ignore
+        
+        if writer is None:
+            writer = PageWriter()
+        dependencies = IndexPage.dependencies(
+            all_athletes, races, combined_5k, combined_marathon, projections_page, league)
+        if data_page is not None:
+            #The leaderboard is filled in from the data file, so only the race lists matter
+            dependencies = dependencies[1:] + (data_page,)
+        if not writer.needs_update(page, dependencies):
+            return
+
+        with writer.open(page) as file_id:
             hp.html_header('ADAC Road Race Championship', 'css/styles.css', file_id)
-            IndexPage.print_overall_table(all_athletes, file_id)
+            IndexPage.print_overall_table(all_athletes, file_id, data_page)
             IndexPage.print_race_summary(races, combined_5k, combined_marathon, file_id)
-            hp.html_footer(file_id, 'scripts/filters.js')
+            if projections_page is not None:
+                hp.html_h('Projections', 2, file=file_id)
+                hp.html_list([hp.html_link('Projected final standings', projections_page)], file=file_id)
+            if league:
+                hp.html_h('League', 2, file=file_id)
+                league_races = [
+                    hp.html_link('5K leaderboard', LEAGUE_5K_PAGE),
+                    hp.html_link('Marathon leaderboard', LEAGUE_MARATHON_PAGE)
+                ]
+                hp.html_list(league_races, file=file_id)
+            hp.html_footer(file_id, 'scripts/data_tables.js' if data_page is not None else 'scripts/filters.js')
     
     @staticmethod
     def print_race_summary(races:Collection[Race], combined_5k:Race, combined_marathon:Race, file_id=None):
@@ -39,31 +81,41 @@ class IndexPage:
         hp.html_h('Combined Races', 2, file=file_id)
         hp.html_list(combined_races, file=file_id)
 
+        records = [
+            hp.html_link('Club records', CLUB_RECORDS_PAGE),
+            hp.html_link('Personal bests', PERSONAL_BESTS_PAGE)
+        ]
+        hp.html_h('Records', 2, file=file_id)
+        hp.html_list(records, file=file_id)
+
     @staticmethod
-    def print_overall_table(all_athletes:dict[str,Athlete], file_id=None):
+    def print_overall_table(all_athletes:dict[str,Athlete], file_id=None, data_page:Path=None): #type: ignore
         
         def print_table_headers():
             hp.html_start_table(
                 ['Athlete', 'Gender  ', 'Category  ', 'Num. races', 'Time score', 'Age % score', 'Total score'], file=file_id)
 
-        def print_table_row(athlete:Athlete):
+        def table_row_cols(athlete:Athlete)->list:
             gender = 'M' if athlete.male else 'F'
-            n_races = len(athlete.counting_races)
-            if n_races:
-                hp.html_table_row(
-                    [
-                        hp.html_link(athlete.name, athlete.summary_page),
-                        gender,
-                        athlete.age_category,
-                        n_races,
-                        athlete.time_score,
-                        athlete.age_pct_score,
-                        athlete.total_score],
-                    file=file_id)
+            return [
+                hp.html_link(athlete.name, athlete.summary_page),
+                gender,
+                athlete.age_category,
+                len(athlete.counting_races),
+                athlete.time_score,
+                athlete.age_pct_score,
+                athlete.total_score]
         
         hp.html_h('ADAC Road Race Championship', 1, file=file_id)
         hp.html_h('Overall leaderboard', 2, file=file_id)
+        if data_page is not None:
+            hp.html_data_table(data_page, file=file_id)
+            return
         print_table_headers()
-        for athlete in sorted(all_athletes.values(), key=lambda a:(a.total_score, not a.male), reverse=True):
-            print_table_row(athlete)
+        hp.html_table_rows(
+            [
+                table_row_cols(athlete)
+                for athlete in sorted(all_athletes.values(), key=lambda a:(a.total_score, not a.male), reverse=True)
+                if athlete.counting_races],
+            file=file_id)
         hp.html_end_table(file=file_id)
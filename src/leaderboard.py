@@ -0,0 +1,44 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+
+from src.athlete import Athlete
+
+@dataclass
+class Leaderboard:
+    athletes:dict[str,Athlete]
+
+    def __post_init__(self):
+        #Snapshot each athlete's score, gender and category once, so ranking
+        #doesn't recompute the Athlete properties on every comparison
+        self.scores:dict[str,int] = {}
+        self.categories:dict[str,str] = {}
+        by_gender:dict[bool,list[int]] = {True: [], False: []}
+        by_category:dict[tuple[bool,str],list[int]] = {}
+        for name, athlete in self.athletes.items():
+            score = athlete.total_score
+            category = athlete.age_category
+            self.scores[name] = score
+            self.categories[name] = category
+            by_gender[athlete.male].append(score)
+            by_category.setdefault((athlete.male, category), []).append(score)
+
+        #Ascending score lists for each group, so ranks are a bisect away
+        self.overall = sorted(self.scores.values())
+        self.by_gender = {male: sorted(scores) for male, scores in by_gender.items()}
+        self.by_category = {key: sorted(scores) for key, scores in by_category.items()}
+
+    @staticmethod
+    def rank(sorted_scores:list[int], score:int)->tuple[int,int]:
+        #One more than the number that scored more, so tied athletes share a position
+        total = len(sorted_scores)
+        return total - bisect_right(sorted_scores, score) + 1, total
+
+    def overall_rank(self, athlete:Athlete)->tuple[int,int]:
+        return Leaderboard.rank(self.overall, self.scores[athlete.name])
+
+    def gender_rank(self, athlete:Athlete)->tuple[int,int]:
+        return Leaderboard.rank(self.by_gender[athlete.male], self.scores[athlete.name])
+
+    def category_rank(self, athlete:Athlete)->tuple[int,int]:
+        key = (athlete.male, self.categories[athlete.name])
+        return Leaderboard.rank(self.by_category[key], self.scores[athlete.name])
@@ -0,0 +1,119 @@
+import os
+import time
+from copy import copy
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.csv_loader import ClubRow, load_club_list
+from src.league_page import LEAGUE_5K_PAGE, LEAGUE_MARATHON_PAGE, LeaguePage
+from src.page_writer import PageWriter
+from src.race import Race, combined_race
+from src.race_entry import RaceEntry
+from src.race_processor import RaceProcessor
+
+CLUBS_PATH = Path() / 'clubs.csv'
+
+@dataclass
+class ClubShard:
+    #What the league needs from a club once its own pages are written: copies of its best
+    #5k and marathon entries, and the categories and pages of the athletes and races in them
+    club:str
+    root:Path
+    season:int
+    best_5k:list[RaceEntry]
+    best_marathon:list[RaceEntry]
+    categories:dict[str,str]
+    athlete_pages:dict[str,Path]
+    race_pages:dict[str,Path]
+    build_time:float = 0.0
+
+    @staticmethod
+    def from_processor(club:ClubRow, processor:RaceProcessor)->'ClubShard':
+        #Copied, as scoring the league leaderboards sets the entries' scores
+        entries = processor.combined_5k.athletes + processor.combined_marathon.athletes
+        athletes = {race_entry.athlete: processor.athletes[race_entry.athlete] for race_entry in entries}
+        races = {race_entry.race_name for race_entry in entries if race_entry.race_name}
+        return ClubShard(
+            club=club.name,
+            root=club.directory,
+            season=processor.season,
+            best_5k=[copy(race_entry) for race_entry in processor.combined_5k.athletes],
+            best_marathon=[copy(race_entry) for race_entry in processor.combined_marathon.athletes],
+            categories={name: athlete.age_category for name, athlete in athletes.items()},
+            athlete_pages={name: athlete.summary_page for name, athlete in athletes.items()},
+            race_pages={name: processor.races[name].summary_page for name in races})
+
+def process_club(club:ClubRow, processor_args:dict)->ClubShard:
+    #Build one club's site in its own directory, which is laid out like a single club
+    #build (athletes_list.csv, race_list.csv, races/ and docs/), so every path the
+    #processor and pages use, and every link between pages, is relative to it
+    start = time.perf_counter()
+    cwd = Path.cwd()
+    os.chdir(club.directory)
+    try:
+        processor = RaceProcessor(
+            athlete_list_path = Path('athletes_list.csv'),
+            race_list_path = Path('race_list.csv'),
+            league = True,
+            **processor_args)
+        processor.process_races()
+        shard = ClubShard.from_processor(club, processor)
+    finally:
+        os.chdir(cwd)
+    shard.build_time = time.perf_counter() - start
+    return shard
+
+@dataclass
+class League:
+    #Runs every club in the club list as an independent shard, several at once with jobs > 1,
+    #then merges their best 5k and marathon entries into league leaderboards, scored the
+    #same way as each club's combined leaderboards, and adds them to every club's site
+    clubs_path:Path = CLUBS_PATH
+    jobs:int = 1
+    processor_args:dict = field(default_factory=dict)
+    shards:list[ClubShard] = field(default_factory=list)
+    league_5k:Race = None #type: ignore
+    league_marathon:Race = None #type: ignore
+
+    def process_clubs(self):
+        clubs = load_club_list(self.clubs_path)
+        if not clubs:
+            raise ValueError(f'No clubs in {self.clubs_path}')
+        if len({club.name for club in clubs}) != len(clubs):
+            raise ValueError(f'Club names in {self.clubs_path} must be unique')
+
+        if self.jobs <= 1:
+            self.shards = [process_club(club, self.processor_args) for club in clubs]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(self.jobs, len(clubs))) as executor:
+                self.shards = list(executor.map(process_club, clubs, [self.processor_args]*len(clubs)))
+        for shard in self.shards:
+            print(f'{shard.club}: built in {shard.build_time:.2f}s')
+
+    def make_league_races(self):
+        self.league_5k = combined_race(
+            'League 5k leaderboard',
+            [race_entry for shard in self.shards for race_entry in shard.best_5k], is_5k=True)
+        self.league_marathon = combined_race(
+            'League marathon leaderboard',
+            [race_entry for shard in self.shards for race_entry in shard.best_marathon], is_5k=False)
+
+    def print_league_pages(self):
+        entries_5k = [(shard.club, race_entry) for shard in self.shards for race_entry in shard.best_5k]
+        entries_marathon = [(shard.club, race_entry) for shard in self.shards for race_entry in shard.best_marathon]
+        categories = {
+            (shard.club, name): category for shard in self.shards for name, category in shard.categories.items()}
+        for shard in self.shards:
+            writer = PageWriter(root=shard.root)
+            for page, is_5k, entries in (
+                (LEAGUE_5K_PAGE, True, entries_5k), (LEAGUE_MARATHON_PAGE, False, entries_marathon)):
+                LeaguePage.print_league_page(
+                    page, is_5k, entries, shard.club, categories, shard.athlete_pages, shard.race_pages,
+                    shard.season, writer)
+            print(f'{shard.club}: {writer.summary()}')
+
+    def process_league(self):
+        self.process_clubs()
+        self.make_league_races()
+        self.print_league_pages()
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+from src.race_entry import RaceEntry
+
+import src.html_pages as hp
+from src.page_writer import PageWriter
+from src.utils import date_to_str, season_label, secs_to_time_str
+
+LEAGUE_5K_PAGE = Path() / 'docs' / 'league_5k.html'
+LEAGUE_MARATHON_PAGE = Path() / 'docs' / 'league_marathon.html'
+
+class LeaguePage:
+
+    @staticmethod
+    def table_rows(
+        entries:list[tuple[str,RaceEntry]], home_club:str, categories:dict[tuple[str,str],str],
+        athlete_pages:dict[str,Path], race_pages:dict[str,Path])->list[list]:
+        #Only the home club's athletes and races have pages on this club's site to link to
+
+        def table_row_cols(club:str, race_entry:RaceEntry)->list:
+            is_home = club == home_club
+            return [
+                hp.html_link(race_entry.athlete, athlete_pages[race_entry.athlete])
+                if is_home else race_entry.athlete,
+                'M' if race_entry.male else 'F',
+                categories[(club, race_entry.athlete)],
+                club,
+                hp.html_link(race_entry.race_name, race_pages[race_entry.race_name])
+                if is_home else race_entry.race_name,
+                date_to_str(race_entry.race_date),
+                secs_to_time_str(race_entry.time),
+                f'{race_entry.age_pct:3.2f}',
+                race_entry.time_score,
+                race_entry.age_pct_score,
+                race_entry.total_score]
+
+        return [
+            table_row_cols(club, race_entry) for club, race_entry in sorted(entries, key=lambda e:e[1].time)
+            if race_entry.race_name]
+
+    @staticmethod
+    def print_league_page(
+        page:Path, is_5k:bool, entries:list[tuple[str,RaceEntry]], home_club:str,
+        categories:dict[tuple[str,str],str], athlete_pages:dict[str,Path], race_pages:dict[str,Path],
+        season:int, writer:PageWriter=None): #type: ignore
+
+        if writer is None:
+            writer = PageWriter()
+        rows = LeaguePage.table_rows(entries, home_club, categories, athlete_pages, race_pages)
+        if not writer.needs_update(page, (season, rows)):
+            return
+
+        race_str = '5K' if is_5k else 'marathon'
+        with writer.open(page) as file_id:
+            hp.html_header(f'ADAC Road Race Championship - League best {race_str}', 'css/styles.css', file_id)
+            hp.html_h('ADAC Road Race Championship', 1, file=file_id)
+            hp.html_h(f'League best {race_str}, {season_label(season)}', 2, file=file_id)
+            hp.html_p(
+                f"Every club's combined {race_str} leaderboard merged into one, and scored across "
+                'all the clubs in the league.', file=file_id)
+            hp.html_start_table(
+                ['Athlete', 'Gender  ', 'Category  ', 'Club', 'Race', 'Date', 'Time', 'Age %', 'Time score',
+                 'Age % score', 'Race score'],
+                file=file_id)
+            hp.html_table_rows(rows, file=file_id)
+            hp.html_end_table(file=file_id)
+            hp.html_p(hp.html_link('<br><br>Home', Path('index.html')), file=file_id)
+            hp.html_footer(file_id, 'scripts/filters.js')
@@ -0,0 +1,265 @@
+import hashlib
+import json
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from src.csv_loader import load_alias_list, load_athlete_list
+
+if TYPE_CHECKING:
+    import numpy as np
+
+ALIASES_PATH = Path() / 'races' / 'aliases.csv'
+
+#Common short forms of first names, each mapped to one full form so 'Andy Pickford'
+#and 'Andrew Pickford' share a key
+NICKNAMES = {
+    'alexander': ['alex', 'alec', 'sandy'],
+    'andrew': ['andy', 'drew'],
+    'anthony': ['tony', 'ant'],
+    'benjamin': ['ben', 'benny'],
+    'catherine': ['cath', 'cathy', 'kate', 'katie', 'kat', 'katherine', 'kathryn', 'kathy'],
+    'christopher': ['chris', 'kit'],
+    'daniel': ['dan', 'danny'],
+    'david': ['dave', 'davy'],
+    'deborah': ['debbie', 'deb', 'debra'],
+    'edward': ['ed', 'eddie', 'ted', 'teddy'],
+    'elizabeth': ['liz', 'lizzie', 'beth', 'betty'],
+    'james': ['jim', 'jimmy', 'jamie'],
+    'jennifer': ['jen', 'jenny'],
+    'jonathan': ['jon', 'jonny'],
+    'joseph': ['joe', 'joey'],
+    'margaret': ['maggie', 'meg', 'peggy'],
+    'matthew': ['matt'],
+    'michael': ['mike', 'mick', 'mickey', 'micky'],
+    'nicholas': ['nick', 'nicky'],
+    'patrick': ['pat', 'paddy'],
+    'peter': ['pete'],
+    'philip': ['phil', 'phillip'],
+    'rebecca': ['becky', 'becca', 'bec'],
+    'richard': ['rich', 'rick', 'ricky', 'richie', 'dick'],
+    'robert': ['rob', 'robbie', 'bob', 'bobby', 'bert'],
+    'samuel': ['sam', 'sammy'],
+    'stephen': ['steve', 'steven', 'stevie'],
+    'susan': ['sue', 'susie'],
+    'thomas': ['tom', 'tommy'],
+    'timothy': ['tim', 'timmy'],
+    'victoria': ['vicky', 'vicki', 'tori'],
+    'william': ['will', 'bill', 'billy', 'liam'],
+}
+FIRST_NAMES = {
+    variant: full_name for full_name, variants in NICKNAMES.items() for variant in [full_name] + variants}
+
+#Fuzzy matches are only tried against the athletes with the same first name (as a full
+#form) sharing the most trigrams with the name, and accepted within this many edits
+#(fewer for short names). Keeping the first name means a typo never turns Joan into John
+MAX_CANDIDATES = 8
+MAX_EDIT_DISTANCE = 2
+CHARS_PER_EDIT = 6
+CERTAIN_METHODS = ('exact', 'alias', 'normalised', 'nickname')
+
+class NameMatch(NamedTuple):
+    #How a results name was resolved: method is one of 'exact', 'alias', 'dropped',
+    #'normalised', 'nickname', 'short', 'fuzzy', 'ambiguous' or 'unmatched', with athlete
+    #None unless it was matched. Candidates are the athletes an ambiguous name could be
+    name:str
+    athlete:str
+    method:str
+    candidates:tuple[str,...] = ()
+
+    @property
+    def is_certain(self)->bool:
+        #Only these are safe to score; 'short' (middle names dropped) and 'fuzzy' matches
+        #are guesses, for the importers to list and someone to confirm in the alias table
+        return self.method in CERTAIN_METHODS
+
+def load_aliases(path:Path=ALIASES_PATH)->dict[str,str]:
+    #Results name -> athlete list name, with an empty name to drop the runner
+    if not path.exists():
+        return {}
+    return {results_name: athlete_name for results_name, athlete_name in load_alias_list(path)}
+
+def normalise_name(name:str)->str:
+    #Lower case ASCII words, so accents, punctuation, spacing and 'SURNAME, First'
+    #ordering don't matter, eg 'O'Brien,  Siân' -> 'sian obrien'
+    if ',' in name:
+        last_name, _, first_name = name.partition(',')
+        name = f'{first_name} {last_name}'
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode().lower()
+    name = re.sub(r"['.]", '', name)
+    return ' '.join(re.sub(r'[^a-z]+', ' ', name).split())
+
+def nickname_key(key:str)->str:
+    #A normalised name with its first name replaced by the full form
+    first_name, _, rest = key.partition(' ')
+    return f'{FIRST_NAMES.get(first_name, first_name)} {rest}'
+
+def first_name(key:str)->str:
+    #The full form of a normalised name's first name
+    first, _, _ = key.partition(' ')
+    return FIRST_NAMES.get(first, first)
+
+def short_key(key:str)->str:
+    #First and last name only, dropping any middle names or initials
+    words = key.split()
+    return f'{words[0]} {words[-1]}' if len(words) > 2 else key
+
+def trigrams(key:str)->set[str]:
+    padded = f'  {key} '
+    return {padded[i_char:i_char+3] for i_char in range(len(padded) - 2)}
+
+def edit_distance(a:str, b:str, max_distance:int)->int:
+    #Levenshtein distance, or max_distance + 1 if it's any further. Uses Myers' bit-parallel
+    #algorithm, a column of the DP table at a time as bits of an int, so names cost a few
+    #int operations per character rather than a Python loop over every cell
+    out_of_range = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return out_of_range
+    if not a:
+        return min(len(b), out_of_range)
+    match_bits:dict[str,int] = {}
+    for i_a, char in enumerate(a):
+        match_bits[char] = match_bits.get(char, 0) | (1 << i_a)
+    mask = (1 << len(a)) - 1
+    last_bit = 1 << (len(a) - 1)
+    positive, negative, distance = mask, 0, len(a)
+    for char in b:
+        matches = match_bits.get(char, 0)
+        vertical = matches | negative
+        horizontal = (((matches & positive) + positive) ^ positive) | matches
+        horizontal_positive = negative | ~(horizontal | positive) & mask
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & last_bit:
+            distance += 1
+        elif horizontal_negative & last_bit:
+            distance -= 1
+        horizontal_positive = ((horizontal_positive << 1) | 1) & mask
+        horizontal_negative = (horizontal_negative << 1) & mask
+        positive = horizontal_negative | ~(vertical | horizontal_positive) & mask
+        negative = horizontal_positive & vertical
+    return min(distance, out_of_range)
+
+@dataclass
+class NameResolver:
+    #Resolves names in results files to names in the athlete list. The index is built once
+    #from the athlete list, so each name is a few dict lookups: exact, alias table,
+    #normalised, nickname and then first and last name only. Only names still unmatched
+    #are fuzzy matched, and then just against the athletes sharing most trigrams with them.
+    #Any key that more than one athlete has is reported as ambiguous rather than guessed
+    athlete_names:list[str]
+    aliases:dict[str,str] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.exact = set(self.athlete_names)
+        self.normalised:dict[str,list[str]] = {}
+        self.nicknames:dict[str,list[str]] = {}
+        self.short:dict[str,list[str]] = {}
+        for name in self.athlete_names:
+            key = normalise_name(name)
+            self.normalised.setdefault(key, []).append(name)
+            self.nicknames.setdefault(nickname_key(key), []).append(name)
+            self.short.setdefault(nickname_key(short_key(key)), []).append(name)
+        self.cache:dict[str,NameMatch] = {}
+        #Built the first time a name needs fuzzy matching, as usually none do
+        self.fuzzy_keys:list[str] = None #type: ignore
+        self.fuzzy_first_names:'np.ndarray' = None #type: ignore
+        self.first_name_ids:dict[str,int] = None #type: ignore
+        self.postings:dict[str,'np.ndarray'] = None #type: ignore
+
+    def build_fuzzy_index(self):
+        #Trigram postings over the distinct normalised names
+        import numpy as np
+        self.fuzzy_keys = list(self.normalised)
+        self.first_name_ids = {}
+        first_names = [
+            self.first_name_ids.setdefault(first_name(key), len(self.first_name_ids)) for key in self.fuzzy_keys]
+        self.fuzzy_first_names = np.array(first_names, dtype=np.int32)
+        postings:dict[str,list[int]] = {}
+        for i_key, key in enumerate(self.fuzzy_keys):
+            for trigram in trigrams(key):
+                postings.setdefault(trigram, []).append(i_key)
+        self.postings = {trigram: np.array(keys, dtype=np.int32) for trigram, keys in postings.items()}
+
+    @staticmethod
+    def from_athlete_list(athlete_list_path:Path, aliases_path:Path=ALIASES_PATH)->'NameResolver':
+        #For the importers, which don't otherwise need the athlete list
+        return NameResolver(
+            [f'{first_name} {last_name}' for first_name, last_name, _, _ in load_athlete_list(athlete_list_path)],
+            load_aliases(aliases_path))
+
+    def key(self)->str:
+        #Changes whenever a name could resolve differently, so stored matches can be checked
+        names = json.dumps([sorted(self.athlete_names), sorted(self.aliases.items())])
+        return hashlib.sha256(names.encode()).hexdigest()
+
+    def resolve(self, name:str)->NameMatch:
+        match = self.cache.get(name)
+        if match is None:
+            match = self._resolve(name)
+            self.cache[name] = match
+        return match
+
+    def _resolve(self, name:str)->NameMatch:
+        if name in self.exact:
+            return NameMatch(name, name, 'exact')
+        if name in self.aliases:
+            athlete_name = self.aliases[name]
+            return NameMatch(name, athlete_name or None, 'alias' if athlete_name else 'dropped') #type: ignore
+
+        key = normalise_name(name)
+        if not key:
+            return NameMatch(name, None, 'unmatched') #type: ignore
+        for method, index, index_key in (
+            ('normalised', self.normalised, key),
+            ('nickname', self.nicknames, nickname_key(key)),
+            ('short', self.short, nickname_key(short_key(key)))):
+            athletes = index.get(index_key)
+            if athletes is not None:
+                return self._unique(name, athletes, method)
+        return self._fuzzy(name, key)
+
+    def _unique(self, name:str, athletes:list[str], method:str)->NameMatch:
+        if len(athletes) > 1:
+            return NameMatch(name, None, 'ambiguous', tuple(athletes)) #type: ignore
+        return NameMatch(name, athletes[0], method)
+
+    def _fuzzy(self, name:str, key:str)->NameMatch:
+        max_distance = min(MAX_EDIT_DISTANCE, len(key) // CHARS_PER_EDIT)
+        if max_distance == 0:
+            return NameMatch(name, None, 'unmatched') #type: ignore
+
+        import numpy as np
+        if self.postings is None:
+            self.build_fuzzy_index()
+
+        #Each edit changes at most three trigrams, so anything within range must share
+        #at least this many with the name
+        query_trigrams = trigrams(key)
+        min_shared = len(query_trigrams) - 3*max_distance
+        postings = [self.postings[trigram] for trigram in query_trigrams if trigram in self.postings]
+        if len(postings) < max(min_shared, 1):
+            return NameMatch(name, None, 'unmatched') #type: ignore
+        i_first_name = self.first_name_ids.get(first_name(key))
+        if i_first_name is None:
+            return NameMatch(name, None, 'unmatched') #type: ignore
+        shared = np.bincount(np.concatenate(postings), minlength=len(self.fuzzy_keys))
+        candidates = np.flatnonzero((shared >= max(min_shared, 1)) & (self.fuzzy_first_names == i_first_name))
+        if len(candidates) > MAX_CANDIDATES:
+            candidates = candidates[np.argpartition(-shared[candidates], MAX_CANDIDATES)[:MAX_CANDIDATES]]
+
+        distances = {
+            self.fuzzy_keys[i_key]: edit_distance(key, self.fuzzy_keys[i_key], max_distance)
+            for i_key in candidates.tolist()}
+        best = min(distances.values(), default=max_distance + 1)
+        if best > max_distance:
+            return NameMatch(name, None, 'unmatched') #type: ignore
+        athletes = [
+            athlete for fuzzy_key, distance in distances.items() if distance == best
+            for athlete in self.normalised[fuzzy_key]]
+        return self._unique(name, athletes, 'fuzzy')
+
+    def report(self)->list[NameMatch]:
+        #Every name resolved so far that wasn't an exact or alias match, to review
+        return [match for match in self.cache.values() if match.method not in ('exact', 'alias', 'dropped')]
@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.athlete import Athlete
+from src.athlete_page import AthletePage
+from src.data_bundle import DataBundle, data_path, full_data_path
+from src.index_page import IndexPage
+from src.leaderboard import Leaderboard
+from src.page_writer import PageResults, PageWriter
+from src.projections_page import ProjectionsPage
+from src.race import Race
+from src.race_page import RacePage
+from src.records import RecordsIndex
+from src.records_page import CLUB_RECORDS_PAGE, PERSONAL_BESTS_PAGE, RecordsPage
+from src.season_archive import SeasonArchive
+from src.season_simulator import Projection
+
+INDEX_PAGE = Path() / 'docs' / 'index.html'
+PROJECTIONS_PAGE = Path() / 'docs' / 'projections.html'
+
+@dataclass
+class RenderSnapshot:
+    #The scored league, everything the pages need and nothing they don't. In parallel
+    #mode this is pickled once per worker process, and tasks are just page keys
+    athletes:dict[str,Athlete]
+    races:dict[str,Race]
+    combined_5k:Race
+    combined_marathon:Race
+    leaderboard:Leaderboard
+    records:RecordsIndex
+    season:int
+    projection:Projection = None #type: ignore
+    archive:SeasonArchive = None #type: ignore
+    bundle:DataBundle = None #type: ignore
+    league:bool = False
+
+    def page_path(self, task:tuple[str,str])->Path:
+        page_type, key = task
+        if page_type == 'athlete':
+            return self.athletes[key].summary_page
+        elif page_type == 'race':
+            return self.races[key].summary_page
+        elif page_type == 'combined':
+            return (self.combined_5k if key == '5k' else self.combined_marathon).summary_page
+        elif page_type == 'projections':
+            return PROJECTIONS_PAGE
+        elif page_type == 'records':
+            return CLUB_RECORDS_PAGE if key == 'club' else PERSONAL_BESTS_PAGE
+        elif page_type == 'data':
+            return data_path(Path(key))
+        elif page_type == 'data_all':
+            return full_data_path(Path(key))
+        return INDEX_PAGE
+
+    def data_page(self, page:Path)->Path:
+        #The data file a page's table is loaded from, or None to inline the table
+        if self.bundle is None or not self.bundle.has_table(page):
+            return None #type: ignore
+        return data_path(page)
+
+    def page_tasks(self)->list[tuple[str,str]]:
+        tasks = [('athlete', name) for name, athlete in self.athletes.items() if athlete.total_score]
+        tasks += [('race', name) for name in self.races]
+        tasks += [('combined', '5k'), ('combined', 'marathon'), ('records', 'club'), ('records', 'personal')]
+        tasks.append(('index', ''))
+        if self.projection is not None:
+            tasks.append(('projections', ''))
+        if self.bundle is not None:
+            tasks += [('data', page) for page in self.bundle.tables]
+            tasks += [('data_all', page) for page in self.bundle.paged_tables()]
+        return tasks
+
+    def render(self, task:tuple[str,str], writer:PageWriter):
+        page_type, key = task
+        if page_type == 'athlete':
+            athlete = self.athletes[key]
+            history = self.archive.athlete_history(athlete, self.season) if self.archive is not None else None
+            AthletePage.print_athlete_page(
+                athlete, self.leaderboard, self.races,
+                self.combined_5k.summary_page, self.combined_marathon.summary_page, writer, history)
+        elif page_type == 'race':
+            race = self.races[key]
+            RacePage.print_race_page(race, self.athletes, writer, self.data_page(race.summary_page))
+        elif page_type == 'combined':
+            combined = self.combined_5k if key == '5k' else self.combined_marathon
+            RacePage.print_combined_race_page(
+                combined, self.athletes, self.races, self.season, writer, self.data_page(combined.summary_page))
+        elif page_type == 'index':
+            projections_page = PROJECTIONS_PAGE if self.projection is not None else None
+            IndexPage.print_index_page(
+                INDEX_PAGE, self.athletes, self.races.values(), self.combined_5k, self.combined_marathon, writer,
+                projections_page, self.data_page(INDEX_PAGE), self.league)
+        elif page_type == 'data':
+            self.bundle.write_table(key, writer)
+        elif page_type == 'data_all':
+            self.bundle.write_full_table(key, writer)
+        elif page_type == 'records':
+            if key == 'club':
+                RecordsPage.print_club_records_page(self.records, self.athletes, self.races, writer)
+            else:
+                RecordsPage.print_personal_bests_page(self.records, self.athletes, writer)
+        elif page_type == 'projections':
+            ProjectionsPage.print_projections_page(PROJECTIONS_PAGE, self.projection, self.athletes, writer)
+        else:
+            raise ValueError(f'Unknown page type {page_type}')
+
+_worker_snapshot:RenderSnapshot = None #type: ignore
+_worker_writer:PageWriter = None #type: ignore
+
+def _init_worker(snapshot:RenderSnapshot, writer_args:dict):
+    #One writer per worker, so the stored signatures are read and the renderer hashed once
+    global _worker_snapshot, _worker_writer
+    _worker_snapshot = snapshot
+    _worker_writer = PageWriter(**writer_args)
+
+def _render_chunk(tasks:list[tuple[str,str]])->PageResults:
+    for task in tasks:
+        _worker_snapshot.render(task, _worker_writer)
+    return _worker_writer.take_results()
+
+def render_pages(snapshot:RenderSnapshot, writer:PageWriter, jobs:int=1):
+    tasks = snapshot.page_tasks()
+    if jobs <= 1:
+        for task in tasks:
+            snapshot.render(task, writer)
+        return
+
+    #Several chunks per worker so the pool stays busy when page sizes vary
+    n_chunks = 4*jobs
+    chunks = [tasks[i_chunk::n_chunks] for i_chunk in range(n_chunks)]
+    writer_args = {'root': writer.root, 'signatures_path': writer.signatures_path}
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(snapshot, writer_args)) as executor:
+        for results in executor.map(_render_chunk, [chunk for chunk in chunks if chunk]):
+            writer.merge(results)
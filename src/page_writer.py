@@ -0,0 +1,139 @@
+import hashlib
+import io
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+#Any change to the page rendering code must invalidate the stored signatures,
+#otherwise layout changes would never be written out
+RENDERER_MODULES = ['html_pages.py', 'athlete_page.py', 'race_page.py', 'index_page.py', 'projections_page.py',
+    'records_page.py', 'data_bundle.py', 'league_page.py']
+
+def renderer_key()->str:
+    hasher = hashlib.sha1()
+    for module in RENDERER_MODULES:
+        hasher.update((Path(__file__).parent / module).read_bytes())
+    return hasher.hexdigest()
+
+@dataclass
+class PageResults:
+    #What a writer has rendered since its results were last taken: the counters, render
+    #times and the new signatures, but not the old ones it was loaded with
+    pages_rendered:int = 0
+    pages_written:int = 0
+    pages_unchanged:int = 0
+    pages_skipped:int = 0
+    new_signatures:dict[str,list] = field(default_factory=dict)
+    render_times:dict[str,float] = field(default_factory=dict)
+    render_counts:dict[str,int] = field(default_factory=dict)
+
+@dataclass
+class PageWriter:
+    root:Path = field(default_factory=Path)
+    signatures_path:Path = None #type: ignore
+    pages_rendered:int = 0
+    pages_written:int = 0
+    pages_unchanged:int = 0
+    pages_skipped:int = 0
+
+    def __post_init__(self):
+        self.renderer_key = renderer_key()
+        self.old_signatures:dict[str,list] = {}
+        self.new_signatures:dict[str,list] = {}
+        #Render times and counts by page type (the directory the page is in, or the
+        #page name for top-level pages)
+        self.render_times:dict[str,float] = {}
+        self.render_counts:dict[str,int] = {}
+        if self.signatures_path is not None and self.signatures_path.exists():
+            stored = json.loads(self.signatures_path.read_text())
+            if stored.get('renderer') == self.renderer_key:
+                self.old_signatures = stored['pages']
+
+    def needs_update(self, page:Path, dependencies)->bool:
+        #Pages are skipped without rendering if everything they display is the same as
+        #the last run, and the file on disk hasn't been touched since we wrote it
+        key = page.as_posix()
+        signature = hashlib.sha1(repr(dependencies).encode()).hexdigest()
+        path = self.root / page
+        old = self.old_signatures.get(key)
+        if old is not None and old[0] == signature and path.exists() and path.stat().st_mtime_ns == old[1]:
+            self.new_signatures[key] = old
+            self.pages_skipped += 1
+            return False
+
+        self.new_signatures[key] = [signature, None]
+        return True
+
+    @contextmanager
+    def open(self, page:Path):
+        start = time.perf_counter()
+        buffer = io.StringIO()
+        yield buffer
+        self.write(page, buffer.getvalue())
+
+        page_type = page.stem if page.parent.name == 'docs' else page.parent.name
+        self.render_times[page_type] = self.render_times.get(page_type, 0.0) + time.perf_counter() - start
+        self.render_counts[page_type] = self.render_counts.get(page_type, 0) + 1
+
+    def write(self, page:Path, content:str):
+        #Compare-then-replace, so unchanged pages keep their mtime
+        self.pages_rendered += 1
+        path = self.root / page
+        if path.exists() and path.read_text() == content:
+            self.pages_unchanged += 1
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + '.tmp')
+            tmp_path.write_text(content)
+            tmp_path.replace(path)
+            self.pages_written += 1
+
+        key = page.as_posix()
+        if key in self.new_signatures:
+            self.new_signatures[key][1] = path.stat().st_mtime_ns
+
+    def take_results(self)->PageResults:
+        #Hand over what has been rendered so far and start counting again, so a writer
+        #that lives for several batches of pages (eg in a worker process) reports each once
+        results = PageResults(
+            self.pages_rendered, self.pages_written, self.pages_unchanged, self.pages_skipped,
+            self.new_signatures, self.render_times, self.render_counts)
+        self.pages_rendered = self.pages_written = self.pages_unchanged = self.pages_skipped = 0
+        self.new_signatures = {}
+        self.render_times = {}
+        self.render_counts = {}
+        return results
+
+    def merge(self, other:PageResults):
+        #Combine the results of pages rendered by another writer (eg in a worker process)
+        self.pages_rendered += other.pages_rendered
+        self.pages_written += other.pages_written
+        self.pages_unchanged += other.pages_unchanged
+        self.pages_skipped += other.pages_skipped
+        self.new_signatures.update(other.new_signatures)
+        for page_type, render_time in other.render_times.items():
+            self.render_times[page_type] = self.render_times.get(page_type, 0.0) + render_time
+        for page_type, render_count in other.render_counts.items():
+            self.render_counts[page_type] = self.render_counts.get(page_type, 0) + render_count
+
+    def save(self):
+        if self.signatures_path is not None:
+            self.signatures_path.write_text(
+                json.dumps({'renderer': self.renderer_key, 'pages': self.new_signatures}))
+
+    def summary(self)->str:
+        return (
+            f'Pages: {self.pages_rendered} rendered ({self.pages_written} written, '
+            f'{self.pages_unchanged} unchanged), {self.pages_skipped} skipped')
+
+class MemoryPageWriter(PageWriter):
+    #Keeps rendered pages in memory rather than writing them to disk
+    def __post_init__(self):
+        super().__post_init__()
+        self.pages:dict[str,str] = {}
+
+    def write(self, page:Path, content:str):
+        self.pages_rendered += 1
+        self.pages[page.as_posix()] = content
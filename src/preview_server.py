@@ -0,0 +1,117 @@
+import mimetypes
+import threading
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from src.page_renderer import INDEX_PAGE, RenderSnapshot
+from src.page_writer import MemoryPageWriter
+from src.race_processor import RaceProcessor
+
+DOCS_DIR = Path() / 'docs'
+
+@dataclass
+class PreviewServer:
+    #Serves the site straight from the scored league in memory, rendering each page
+    #on first request. Pages are cached until an input file changes on disk
+    processor:RaceProcessor
+    port:int = 8000
+    pages_rendered:int = 0
+    cache_hits:int = 0
+    reloads:int = 0
+
+    def __post_init__(self):
+        self.lock = threading.Lock()
+        self.cache:dict[str,str] = {}
+        self.snapshot:RenderSnapshot = None #type: ignore
+        self.page_tasks:dict[str,tuple[str,str]] = {}
+        self.input_mtimes:dict[Path,int] = {}
+
+    def input_files(self)->list[Path]:
+        files = [self.processor.athlete_list_path, self.processor.race_list_path, self.processor.aliases_path]
+        if self.processor.races:
+            files += [race.race_path for race in self.processor.races.values() if race.in_past]
+        return files
+
+    def current_mtimes(self)->dict[Path,int]:
+        return {path: path.stat().st_mtime_ns for path in self.input_files() if path.exists()}
+
+    def load(self):
+        self.processor.score_league()
+        self.snapshot = self.processor.render_snapshot()
+        self.page_tasks = {
+            self.snapshot.page_path(task).as_posix(): task for task in self.snapshot.page_tasks()}
+        self.cache.clear()
+        self.input_mtimes = self.current_mtimes()
+        self.reloads += 1
+
+    def refresh(self):
+        #Cheap enough to check on every request: one stat per input file
+        if self.current_mtimes() != self.input_mtimes:
+            print('Input files changed, reloading')
+            self.load()
+        elif not self.processor.calendar.is_current:
+            #Categories and which races are past depend on today's date
+            print('Date changed, reloading')
+            self.load()
+
+    def get_page(self, url_path:str)->tuple[bytes,str]:
+        #Map the URL onto the docs folder, as GitHub pages does. Returns None if there's no
+        #such page, while errors building the league (eg a missing race CSV) are raised
+        relative = url_path.split('?')[0].lstrip('/') or INDEX_PAGE.name
+        page = (DOCS_DIR / relative).as_posix()
+        with self.lock:
+            self.refresh()
+            if page in self.cache:
+                self.cache_hits += 1
+                return self.cache[page].encode(), mimetypes.guess_type(page)[0] or 'text/html'
+
+            task = self.page_tasks.get(page)
+            if task is not None:
+                writer = MemoryPageWriter()
+                self.snapshot.render(task, writer)
+                self.cache[page] = writer.pages[page]
+                self.pages_rendered += 1
+                return self.cache[page].encode(), mimetypes.guess_type(page)[0] or 'text/html'
+
+        #Anything else (css, scripts, news) is served from the docs folder
+        static_path = DOCS_DIR / relative
+        if '..' in Path(relative).parts or not static_path.is_file():
+            return None #type: ignore
+        content_type = mimetypes.guess_type(static_path.name)[0] or 'application/octet-stream'
+        return static_path.read_bytes(), content_type
+
+    def serve(self):
+        self.load()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                try:
+                    page = server.get_page(self.path)
+                except (ValueError, OSError) as e:
+                    #Usually an input file caught half-edited or missing, the next request will retry
+                    self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, explain=str(e))
+                    return
+                if page is None:
+                    self.send_error(HTTPStatus.NOT_FOUND)
+                    return
+                content, content_type = page
+                self.send_response(HTTPStatus.OK)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+        httpd = ThreadingHTTPServer(('localhost', self.port), Handler)
+        print(f'Serving preview at http://localhost:{self.port}/ (Ctrl+C to stop)')
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            httpd.server_close()
+            print(
+                f'{self.pages_rendered} pages rendered, {self.cache_hits} served from cache, '
+                f'{self.reloads} loads')
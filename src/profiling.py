@@ -0,0 +1,39 @@
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+@dataclass
+class Profiler:
+    enabled:bool = False
+
+    def __post_init__(self):
+        self.timings:dict[str,dict[str,float]] = {}
+        self.counts:dict[str,dict[str,int]] = {}
+
+    @contextmanager
+    def timer(self, section:str, key:str):
+        #Accumulate the time spent in the block under timings[section][key]. This is
+        #a no-op when profiling is disabled, so can be left in the pipeline
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            section_timings = self.timings.setdefault(section, {})
+            section_timings[key] = section_timings.get(key, 0.0) + time.perf_counter() - start
+
+    def count(self, section:str, key:str, n:int=1):
+        if self.enabled:
+            section_counts = self.counts.setdefault(section, {})
+            section_counts[key] = section_counts.get(key, 0) + n
+
+    def stage(self, name:str):
+        return self.timer('stages', name)
+
+    def write_report(self, path:Path, report:dict):
+        path.write_text(json.dumps(report, indent=2))
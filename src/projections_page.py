@@ -0,0 +1,65 @@
+from pathlib import Path
+
+from src.athlete import Athlete
+from src.season_simulator import Projection
+
+import src.html_pages as hp
+from src.page_writer import PageWriter
+
+class ProjectionsPage:
+
+    @staticmethod
+    def table_rows(projection:Projection, all_athletes:dict[str,Athlete])->list[list]:
+        def table_row_cols(i_athlete:int)->list:
+            athlete = all_athletes[projection.names[i_athlete]]
+            category_positions = projection.category_positions
+            overall_positions = projection.overall_positions
+            return [
+                hp.html_link(athlete.name, athlete.summary_page),
+                'M' if athlete.male else 'F',
+                projection.categories[i_athlete],
+                int(projection.current_totals[i_athlete]),
+                f'{projection.expected_totals[i_athlete]:3.1f}',
+                f'{100*projection.position_probability(category_positions, i_athlete):3.1f}',
+                f'{100*projection.position_probability(category_positions, i_athlete, top=3):3.1f}',
+                projection.likely_position(category_positions, i_athlete),
+                f'{100*projection.position_probability(overall_positions, i_athlete):3.1f}',
+                f'{100*projection.position_probability(overall_positions, i_athlete, top=3):3.1f}',
+                projection.likely_position(overall_positions, i_athlete)]
+
+        order = sorted(
+            range(len(projection.names)), key=lambda i_athlete:projection.expected_totals[i_athlete], reverse=True)
+        return [table_row_cols(i_athlete) for i_athlete in order]
+
+    @staticmethod
+    def print_projections_page(
+        page:Path, projection:Projection, all_athletes:dict[str,Athlete], writer:PageWriter=None): #type: ignore
+
+        if writer is None:
+            writer = PageWriter()
+        rows = ProjectionsPage.table_rows(projection, all_athletes)
+        if not writer.needs_update(page, (projection.n_simulations, tuple(projection.future_races), rows)):
+            return
+
+        with writer.open(page) as file_id:
+            hp.html_header('ADAC Road Race Championship - Projections', 'css/styles.css', file_id)
+            hp.html_h('ADAC Road Race Championship', 1, file=file_id)
+            hp.html_h('Projected final standings', 2, file=file_id)
+            if projection.future_races:
+                hp.html_p(
+                    f'From {projection.n_simulations} simulations of the remaining club races '
+                    f'({", ".join(projection.future_races)}), using who has run the club races so far '
+                    'and their age grades this season. The combined 5k and marathon leaderboards '
+                    'are taken as they stand.', file=file_id)
+            else:
+                hp.html_p('There are no club races left, these are the final standings.', file=file_id)
+
+            hp.html_start_table(
+                [
+                    'Athlete', 'Gender  ', 'Category  ', 'Current score', 'Projected score',
+                    'Win category %', 'Category top 3 %', 'Likely category position',
+                    'Win overall %', 'Overall top 3 %', 'Likely overall position'],
+                file=file_id)
+            hp.html_table_rows(rows, file=file_id)
+            hp.html_end_table(file=file_id)
+            hp.html_footer(file_id, 'scripts/filters.js')
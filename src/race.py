@@ -3,11 +3,12 @@ from datetime import date
 from pathlib import Path
 from warnings import warn
 
-import numpy as np
-
 from src.athlete import Athlete
-from src.race_entry import RaceEntry
-from src.utils import time_str_to_secs
+from src.csv_loader import load_race_results
+from src.name_resolver import NameResolver
+from src.race_entry import MARATHON_KM, RaceEntry, age_pct_batch
+from src.season_calendar import SeasonCalendar
+from src.utils import years_since_batch
 
 MAX_PTS = 25
 
@@ -26,8 +27,11 @@ class Race:
         pass
 
     def assign_scores(self):
-        athletes_m_by_time = sorted([a for a in self.athletes if a.male], key=lambda r:r.time)
-        athletes_f_by_time = sorted([a for a in self.athletes if not a.male], key=lambda r:r.time)
+        #Sorting is stable, so splitting a single sort by gender gives the same order
+        #as sorting each gender separately
+        athletes_by_time = sorted(self.athletes, key=lambda r:r.time)
+        athletes_m_by_time = [a for a in athletes_by_time if a.male]
+        athletes_f_by_time = [a for a in athletes_by_time if not a.male]
         athletes_by_age_pct = sorted(self.athletes, key=lambda r:r.age_pct, reverse=True)
 
         for athletes in [athletes_m_by_time, athletes_f_by_time]:
@@ -40,29 +44,81 @@ class Race:
             athlete.age_pct_score = score
 
 
-    def load_race(self, athletes:dict[str,Athlete]):
-        race_athletes = np.loadtxt(self.race_path, delimiter=',', dtype=str).reshape((-1,2))
+    def load_race(
+        self, athletes:dict[str,Athlete], resolver:NameResolver=None, calendar:SeasonCalendar=None, #type: ignore
+        )->list[str]:
+        #Without a resolver only exact names are matched
+        race_athletes = load_race_results(self.race_path)
         self.athletes = []
-        for name, race_time in race_athletes:
-            try:
-                athlete = athletes[name]
-            except KeyError:
-                warn_str = f'{name} not matched, check athlete list.'
-                warn(warn_str)
+        unmatched = []
+        race_athletes_matched = []
+        for results_name, race_time in race_athletes:
+            match = resolver.resolve(results_name) if resolver is not None else None
+            #Scores are only credited on a certain match, guesses are left for the alias table
+            name = match.athlete if match is not None and match.is_certain else results_name
+            if name not in athletes:
+                if match is not None and match.method == 'ambiguous':
+                    warn(f'{results_name} could be any of {", ".join(match.candidates)}, add it to the alias table.')
+                elif match is not None and match.athlete is not None and not match.is_certain:
+                    warn(
+                        f'{results_name} not matched, it may be {match.athlete}: if so add '
+                        f'"{results_name},{match.athlete}" to the alias table.')
+                elif match is None or match.method != 'dropped':
+                    warn_str = f'{results_name} not matched, check athlete list.'
+                    warn(warn_str)
+                unmatched.append(results_name)
                 continue
+            athlete = athletes[name]
 
             race_entry = RaceEntry(
                 race_name=self.name,
                 athlete=name,
                 race_date=self.race_date, 
-                time=time_str_to_secs(race_time), 
+                time=race_time, 
                 distance=self.distance,
                 male=athlete.male, 
                 is_5k=self.is_5k, 
                 is_marathon=self.is_marathon
             )
-            
-            athlete.add_race(race_entry)
+            self.athletes.append(race_entry)
+            race_athletes_matched.append(athlete)
+
+        #Age grade the whole race in one pass
+        if calendar is not None:
+            ages = calendar.ages_on([race_entry.athlete for race_entry in self.athletes], self.race_date)
+        else:
+            ages = years_since_batch([athlete.dob for athlete in race_athletes_matched], self.race_date)
+        age_pcts = age_pct_batch(
+            ages,
+            [race_entry.male for race_entry in self.athletes],
+            [race_entry.distance for race_entry in self.athletes],
+            [race_entry.time for race_entry in self.athletes])
+        
+        for race_entry, athlete, age_pct in zip(self.athletes, race_athletes_matched, age_pcts.tolist()):
+            race_entry.age_pct = age_pct
+            athlete.add_race(race_entry, age_grade=False)
+        return unmatched
+
+    def restore_entries(self, athletes:dict[str,Athlete], entries:list[tuple]):
+        #Rebuild the race from previously stored results, without re-age-grading
+        self.athletes = []
+        for name, time, age_pct, time_score, age_pct_score in entries:
+            athlete = athletes[name]
+            race_entry = RaceEntry(
+                race_name=self.name,
+                athlete=name,
+                race_date=self.race_date,
+                time=time,
+                distance=self.distance,
+                male=athlete.male,
+                is_5k=self.is_5k,
+                is_marathon=self.is_marathon,
+                time_score=time_score,
+                age_pct=age_pct,
+                age_pct_score=age_pct_score
+            )
+
+            athlete.add_race(race_entry, age_grade=False)
             self.athletes.append(race_entry)
 
     @property
@@ -73,4 +129,17 @@ class Race:
     
     @property
     def in_past(self)->bool:
-        return self.race_date <= date.today() and self.race_path.suffix == '.csv'
\ No newline at end of file
+        return self.race_date <= date.today() and self.race_path.suffix == '.csv'
+
+def combined_race(name:str, athletes:list[RaceEntry], is_5k:bool)->Race:
+    #A leaderboard of best 5k or marathon entries, scored as if they were one race
+    race = Race(
+        name=name,
+        race_date=date.today(),
+        race_path=None, #type: ignore
+        distance=5.0 if is_5k else MARATHON_KM,
+        is_5k=is_5k,
+        is_marathon=not is_5k,
+        athletes=athletes)
+    race.assign_scores()
+    return race
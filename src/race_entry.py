@@ -1,14 +1,128 @@
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import date
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-from agegrader import AgeGrader # type: ignore
-import numpy as np
 from src.utils import years_since
 
-age_grader = AgeGrader()
+if TYPE_CHECKING:
+    import numpy as np
+
 MARATHON_KM = 42.195
+MAX_AGE = 120
+FACTOR_CACHE_SIZE = 100_000
+
+#Loading the age grading tables is slow, so it's only done the first time a factor isn't
+#in the cache rather than whenever this module is imported
+_age_grader = None
+
+def get_age_grader():
+    global _age_grader
+    if _age_grader is None:
+        from agegrader import AgeGrader # type: ignore
+        _age_grader = AgeGrader()
+    return _age_grader
 
+def agegrader_version()->str:
+    #The installed agegrader distribution's version, or '' if it can't be found
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version('agegrader')
+    except PackageNotFoundError:
+        return ''
+
+#The WMA age-graded performance factor is the age-adjusted standard for the distance
+#divided by the time, so we cache the factor for a 1 second run per (age, sex, distance)
+#and then age grade any time with a single division
 @dataclass
+class AgeFactorCache:
+    max_size:int = FACTOR_CACHE_SIZE
+    hits:int = 0
+    misses:int = 0
+
+    def __post_init__(self):
+        self.factors:OrderedDict[tuple[int,bool,float],float] = OrderedDict()
+
+    def __len__(self):
+        return len(self.factors)
+
+    def get(self, age:int, male:bool, distance:float)->float:
+        key = (age, male, distance)
+        factor = self.factors.get(key)
+        if factor is not None:
+            self.hits += 1
+            self.factors.move_to_end(key)
+            return factor
+
+        self.misses += 1
+        mf = 'm' if male else 'f'
+        factor = get_age_grader().age_graded_performance_factor(age, mf, distance, 1)
+        self.factors[key] = factor
+        if len(self.factors) > self.max_size:
+            self.factors.popitem(last=False)
+        return factor
+
+    def clear(self):
+        self.factors.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self)->dict[str,int]:
+        return {'size': len(self.factors), 'hits': self.hits, 'misses': self.misses}
+
+    def load(self, path:Path):
+        #Factors from a different version of the age grading tables are discarded. Without
+        #a version to compare there's no telling, so the cache isn't used at all
+        version = agegrader_version()
+        if not version:
+            print(f'Not using the age factor cache {path}: the agegrader version could not be found')
+            return
+        if not path.exists():
+            return
+        stored = json.loads(path.read_text())
+        if stored.get('agegrader') != version:
+            return
+        for age, male, distance, factor in stored['factors'][-self.max_size:]:
+            self.factors[(age, male, distance)] = factor
+
+    def save(self, path:Path):
+        version = agegrader_version()
+        if not version:
+            return
+        path.write_text(json.dumps({
+            'agegrader': version,
+            'factors': [[*key, factor] for key, factor in self.factors.items()]
+        }))
+
+age_factor_cache = AgeFactorCache()
+
+def age_standards(ages:'np.ndarray', males:'np.ndarray', distance:float)->'np.ndarray':
+    import numpy as np
+    #Look up each distinct (age, sex) once, then broadcast back over the entries
+    keys, inverse = np.unique(males*(MAX_AGE+1) + ages, return_inverse=True)
+    standards = np.array([
+        age_factor_cache.get(int(key % (MAX_AGE+1)), bool(key // (MAX_AGE+1)), distance)
+        for key in keys.tolist()])
+    return standards[inverse] if len(keys) else np.empty(ages.shape)
+
+def age_pct_batch(ages, males, distances, times)->'np.ndarray':
+    import numpy as np
+    ages = np.asarray(ages, dtype=int)
+    males = np.asarray(males, dtype=int)
+    distances = np.broadcast_to(np.asarray(distances, dtype=float), ages.shape)
+    times = np.asarray(times, dtype=float)
+
+    standards = np.empty(ages.shape)
+    for distance in np.unique(distances):
+        in_distance = distances == distance
+        standards[in_distance] = age_standards(ages[in_distance], males[in_distance], float(distance))
+    #Grouped as standard/time then scaled, so each value rounds exactly as the per-entry
+    #100*(standard/time) does
+    return 100*(standards/times)
+
+@dataclass(slots=True)
 class RaceEntry:
     race_name:str
     athlete:str
@@ -19,8 +133,9 @@ class RaceEntry:
     is_5k:bool
     is_marathon:bool
     time_score:int = 0
-    age_pct:float = np.nan
+    age_pct:float = float('nan')
     age_pct_score:int = 0
+    counting:bool = False
 
     def __post_init__(self):
         if self.is_marathon:
@@ -35,7 +150,5 @@ class RaceEntry:
         return not self.is_5k and not self.is_marathon
 
     def compute_age_pct(self, dob:date):
-        mf = 'm' if self.male else 'f'
         yrs = years_since(dob, self.race_date)
-        self.age_pct = 100*age_grader.age_graded_performance_factor(
-            yrs, mf, self.distance, self.time)
\ No newline at end of file
+        self.age_pct = float(age_pct_batch([yrs], [self.male], self.distance, [self.time])[0])
\ No newline at end of file
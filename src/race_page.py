@@ -5,13 +5,53 @@ from src.race import Race
 from src.race_entry import RaceEntry
 
 import src.html_pages as hp
-from src.utils import date_to_str, secs_to_time_str
+from src.page_writer import PageWriter
+from src.utils import date_to_str, season_label, secs_to_time_str
 
 class RacePage:
 
     @staticmethod
-    def print_race_page(race:Race, all_athletes:dict[str,Athlete]):
+    def dependencies(race:Race, all_athletes:dict[str,Athlete], all_races:dict[str,Race]=None)->tuple: #type: ignore
+        #Everything displayed on the page, used to decide whether it needs rewriting
+        def entry_values(race_entry:RaceEntry):
+            athlete = all_athletes[race_entry.athlete]
+            individual_race = all_races.get(race_entry.race_name) if all_races else None
+            return (
+                race_entry.athlete,
+                race_entry.male,
+                athlete.age_category,
+                race_entry.race_name,
+                individual_race.summary_page if individual_race else None,
+                race_entry.race_date,
+                race_entry.time,
+                race_entry.age_pct,
+                race_entry.time_score,
+                race_entry.age_pct_score,
+                race_entry.counting)
+
+        return (
+            race.name,
+            race.race_date,
+            race.is_5k,
+            race.is_marathon,
+            race.race_path,
+            race.in_past if race.race_path is not None else None,
+            tuple(entry_values(r) for r in race.athletes if r.race_name))
+
+    @staticmethod
+    def print_race_page(
+        race:Race, all_athletes:dict[str,Athlete], writer:PageWriter=None, data_page:Path=None): #type: ignore
         
+        if writer is None:
+            writer = PageWriter()
+        if data_page is not None:
+            #The table is filled in from the data file, so the page only changes with the race details
+            dependencies = (race.name, race.race_date, len(race.athletes), data_page)
+        else:
+            dependencies = RacePage.dependencies(race, all_athletes)
+        if not writer.needs_update(race.summary_page, dependencies):
+            return
+
         def print_race_headers(file_id):
             headers = ['Athlete', 'Gender  ', 'Category  ', 'Time', 'Age %']
             if not (race.is_5k or race.is_marathon):
@@ -20,10 +60,10 @@ class RacePage:
             hp.html_start_table(
                 headers, file=file_id, caption=caption)
 
-        def print_race_summary(race_entry:RaceEntry, file_id):
+        def race_summary_cols(race_entry:RaceEntry)->list:
             gender = 'M' if race_entry.male else 'F'
             athlete = all_athletes[race_entry.athlete]
-            counter = '*' if race_entry in athlete.counting_races else ''
+            counter = '*' if race_entry.counting else ''
             cols = [
                     hp.html_link(race_entry.athlete+counter, Path('..')/athlete.summary_page),
                     gender,
@@ -38,44 +78,54 @@ class RacePage:
                     race_entry.age_pct_score,
                     race_entry.total_score
                 ]
-
-            hp.html_table_row(
-                cols,
-                file=file_id)
+            return cols
         
         def print_athlete_list(athletes:list[RaceEntry], file_id):            
             print_race_headers(file_id)
-            for race in sorted(athletes, key=lambda r:r.time):
-                print_race_summary(race, file_id)
+            hp.html_table_rows(
+                [race_summary_cols(race) for race in sorted(athletes, key=lambda r:r.time)], file=file_id)
             hp.html_end_table(file=file_id)
 
-        with race.summary_page.open('wt') as file_id:
+        with writer.open(race.summary_page) as file_id:
             hp.html_header(race.name, '../css/styles.css', file_id)
             hp.html_h(f'{race.name}, {date_to_str(race.race_date)}', 1, file=file_id)
             if race.in_past:
                 hp.html_list([f'Number of Altrincham runners: {len(race.athletes)}'], file=file_id)
-                print_athlete_list(race.athletes, file_id)
+                if data_page is not None:
+                    hp.html_data_table(Path('..')/data_page, file=file_id)
+                else:
+                    print_athlete_list(race.athletes, file_id)
             else:
                 hp.html_p(f"Online entries available {hp.html_link('here', race.race_path)}", file=file_id)
             hp.html_p(hp.html_link('<br><br>Home', Path('../index.html')), file=file_id)
-            hp.html_footer(file_id, '../scripts/filters.js')
+            hp.html_footer(file_id, '../scripts/data_tables.js' if data_page is not None else '../scripts/filters.js')
 
     @staticmethod
-    def print_combined_race_page(race:Race, all_athletes:dict[str,Athlete], all_races:dict[str,Race]):
+    def print_combined_race_page(
+        race:Race, all_athletes:dict[str,Athlete], all_races:dict[str,Race], season:int,
+        writer:PageWriter=None, data_page:Path=None): #type: ignore
         
+        if writer is None:
+            writer = PageWriter()
+        if data_page is not None:
+            dependencies = (race.name, season, data_page)
+        else:
+            dependencies = RacePage.dependencies(race, all_athletes, all_races) + (season,)
+        if not writer.needs_update(race.summary_page, dependencies):
+            return
+
         def print_race_headers(file_id):
             caption = "* denotes race contributes to athlete's total score"
             hp.html_start_table(
                 ['Athlete', 'Gender  ', 'Category  ', 'Race', 'Date', 'Time', 'Age %', 'Time score', 'Age % score', 'Race score'],
                 file=file_id, caption=caption)
 
-        def print_race_summary(race_entry:RaceEntry, file_id):
+        def race_summary_cols(race_entry:RaceEntry)->list:
             gender = 'M' if race_entry.male else 'F'
             athlete = all_athletes[race_entry.athlete]
-            counter = '*' if race_entry in athlete.counting_races else ''
+            counter = '*' if race_entry.counting else ''
             individual_race = all_races[race_entry.race_name]
-            hp.html_table_row(
-                [
+            return [
                     hp.html_link(race_entry.athlete+counter, Path('..')/athlete.summary_page),
                     gender,
                     athlete.age_category,
@@ -86,22 +136,24 @@ class RacePage:
                     race_entry.time_score,
                     race_entry.age_pct_score,
                     race_entry.total_score
-                ],
-                file=file_id)
+                ]
         
         def print_athlete_list(athletes:list[RaceEntry], file_id):
             
             print_race_headers(file_id)
-            for race in sorted(athletes, key=lambda r:r.time):
-                if race.race_name:
-                    print_race_summary(race, file_id)
+            hp.html_table_rows(
+                [race_summary_cols(race) for race in sorted(athletes, key=lambda r:r.time) if race.race_name],
+                file=file_id)
             hp.html_end_table(file=file_id)
 
         race_str = '5K' if race.is_5k else 'marathon'
 
-        with race.summary_page.open('wt') as file_id:
+        with writer.open(race.summary_page) as file_id:
             hp.html_header(f'Combined best {race_str}', '../css/styles.css', file_id)
-            hp.html_h(f'Combined best {race_str}, June 2025 - May 2026', 1, file=file_id)
-            print_athlete_list(race.athletes, file_id)
+            hp.html_h(f'Combined best {race_str}, {season_label(season)}', 1, file=file_id)
+            if data_page is not None:
+                hp.html_data_table(Path('..')/data_page, file=file_id)
+            else:
+                print_athlete_list(race.athletes, file_id)
             hp.html_p(hp.html_link('<br><br>Home', Path('../index.html')), file=file_id)
-            hp.html_footer(file_id, '../scripts/filters.js')
\ No newline at end of file
+            hp.html_footer(file_id, '../scripts/data_tables.js' if data_page is not None else '../scripts/filters.js')
\ No newline at end of file
@@ -1,16 +1,23 @@
-from dataclasses import dataclass
-from datetime import date
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
 
-import numpy as np
-
 from src.athlete import Athlete
-from src.athlete_page import AthletePage
-from src.index_page import IndexPage
-from src.race import Race
-from src.race_page import RacePage
-from src.race_entry import MARATHON_KM
-from src.utils import date_from_str, distance_in_kms
+from src.csv_loader import load_athlete_list, load_race_list
+from src.data_bundle import DataBundle
+from src.leaderboard import Leaderboard
+from src.name_resolver import ALIASES_PATH, NameResolver, load_aliases
+from src.page_renderer import INDEX_PAGE, RenderSnapshot, render_pages
+from src.page_writer import PageWriter
+from src.profiling import Profiler
+from src.race import Race, combined_race
+from src.race_entry import age_factor_cache
+from src.records import RecordsIndex
+from src.results_store import ResultsStore
+from src.season_archive import SeasonArchive
+from src.season_calendar import SeasonCalendar
+from src.season_simulator import Projection, SeasonSimulator
+from src.utils import season_of
 
 @dataclass
 class RaceProcessor:
@@ -20,98 +27,301 @@ class RaceProcessor:
     races:dict[str,Race] = None #type: ignore
     combined_5k:Race = None #type: ignore
     combined_marathon:Race = None #type: ignore
+    leaderboard:Leaderboard = None #type: ignore
+    aliases_path:Path = ALIASES_PATH
+    resolver:NameResolver = None #type: ignore
+    calendar:SeasonCalendar = None #type: ignore
+    records:RecordsIndex = None #type: ignore
+    store_path:Path = None #type: ignore
+    store:ResultsStore = None #type: ignore
+    signatures_path:Path = None #type: ignore
+    page_writer:PageWriter = None #type: ignore
+    factor_cache_path:Path = None #type: ignore
+    archive_path:Path = None #type: ignore
+    archive:SeasonArchive = None #type: ignore
+    jobs:int = 1
+    simulations:int = 0
+    projection:Projection = None #type: ignore
+    data_bundle:bool = False
+    bundle:DataBundle = None #type: ignore
+    league:bool = False
+    profiler:Profiler = field(default_factory=Profiler)
+    changed_athletes:set[str] = field(default_factory=set)
 
     def __post_init__(self):
         pass
 
     def load_athletes(self):
-        athlete_data = np.loadtxt(self.athlete_list_path, delimiter=',', dtype=str)
         self.athletes = {}
-        for first_name, last_name, gender, dob in athlete_data:
+        for first_name, last_name, male, dob in load_athlete_list(self.athlete_list_path):
             name= f'{first_name} {last_name}'
             self.athletes[name] = Athlete(
                 name=name,
-                dob=date_from_str(dob),
-                male=gender.lower()=='male'
+                dob=dob,
+                male=male
             )
+        self.resolver = NameResolver(list(self.athletes), load_aliases(self.aliases_path))
 
     def load_races(self):
 
-        race_details = np.loadtxt(self.race_list_path, delimiter=',', dtype=str, skiprows=1)
-
         self.races = {}
-        for name, distance, race_date_str, is_5k_str, is_marathon_str, filepath in race_details:
+        race_list = load_race_list(self.race_list_path)
+        self.calendar = SeasonCalendar(self.athletes, [row.race_date for row in race_list])
+        self.calendar.assign_categories()
+        self.records = RecordsIndex(self.calendar)
+        for name, distance, race_date, is_5k, is_marathon, filepath in race_list:
             
-            is_5k = bool(int(is_5k_str))
-            is_marathon = bool(int(is_marathon_str))
-            race_date = date_from_str(race_date_str)
             race = Race(
                 name=name,
                 race_date=race_date, 
-                race_path=Path(filepath), 
-                distance=distance_in_kms(distance), 
+                race_path=filepath, 
+                distance=distance, 
                 is_5k=is_5k, 
                 is_marathon=is_marathon)
             if race.in_past:
-                race.load_race(self.athletes)
-                if not is_5k and not is_marathon:
-                    race.assign_scores()
+                self.load_race(race)
 
             self.races[name] = race
-            
+
+        if self.store is not None:
+            self.store.prune(list(self.races))
+
+    def load_race(self, race:Race):
+        #In incremental mode, races whose CSV and race list entry are unchanged are
+        #restored from the store with their age grades and scores already computed
+        with self.profiler.timer('race_load', race.name):
+            restored = self.store is not None and self.store.restore_race(race, self.athletes, self.resolver)
+            if not restored:
+                unmatched = race.load_race(self.athletes, self.resolver, self.calendar)
+        self.profiler.count('race_entries', race.name, len(race.athletes))
+        self.records.add_race(race, self.athletes)
+        if restored:
+            self.profiler.count('races', 'restored')
+            return
+
+        self.profiler.count('races', 'loaded')
+        with self.profiler.timer('race_score', race.name):
+            if not race.is_5k and not race.is_marathon:
+                race.assign_scores()
+
+        if self.store is not None:
+            self.store.save_race(race, self.athletes, self.resolver, unmatched)
         
+    def reload_races(self, race_names:list[str]):
+        #Replace the entries of the given races with their current CSV contents,
+        #leaving every other race as it is
+        for name in race_names:
+            race = self.races[name]
+            for race_entry in race.athletes:
+                self.athletes[race_entry.athlete].remove_race(race_entry)
+            race.athletes = []
+            if race.in_past:
+                self.load_race(race)
+
+        #A record holder's entry may have gone, which needs the runner up, so rebuild the
+        #records from scratch (a single pass over the entries)
+        self.records = RecordsIndex.from_races(self.races.values(), self.athletes, self.calendar)
+
+        race_order = {name: i_race for i_race, name in enumerate(self.races)}
+        reloaded = {race_entry.athlete for name in race_names for race_entry in self.races[name].athletes}
+        for athlete_name in reloaded:
+            self.athletes[athlete_name].sort_races(race_order)
+
     def make_combined_5k(self):
         athletes = [athlete.best_5k for athlete in self.athletes.values() if athlete.best_5k is not None]
-        self.combined_5k = Race(
-            name='Combined 5k leaderboard', 
-            race_date=date.today(), 
-            race_path=None, #type: ignore
-            distance=5.0,
-            is_5k=True, 
-            is_marathon=False, 
-            athletes=athletes)
-        self.combined_5k.assign_scores()
+        self.combined_5k = combined_race('Combined 5k leaderboard', athletes, is_5k=True)
 
     def make_combined_marathon(self):
         athletes = [athlete.best_marathon for athlete in self.athletes.values() if athlete.best_marathon is not None]
-        self.combined_marathon = Race(
-            name='Combined marathon leaderboard', 
-            race_date=date.today(), 
-            race_path=None, #type: ignore
-            distance=MARATHON_KM,
-            is_5k=False, 
-            is_marathon=True, 
-            athletes=athletes)
-        self.combined_marathon.assign_scores()
+        self.combined_marathon = combined_race('Combined marathon leaderboard', athletes, is_5k=False)
 
     def update_athlete_scores(self):
         for athlete in self.athletes.values():
             athlete.update_scores_lists()
 
+    def make_leaderboard(self):
+        self.leaderboard = Leaderboard(self.athletes)
+
+    @property
+    def season(self)->int:
+        #The season the race list is for, from its last race so stray races from the
+        #end of the previous season don't count
+        return season_of(max(race.race_date for race in self.races.values()))
+
+    def archive_season(self):
+        #Keep the current season's scored results in the archive, so once the race list
+        #moves on to the next season the athlete pages can still show them
+        if self.archive is not None:
+            self.archive.save_season(self.season, self.athletes, self.races.values())
+
+    def make_projections(self):
+        if self.simulations > 0:
+            simulator = SeasonSimulator(self.athletes, self.races, jobs=self.jobs, calendar=self.calendar)
+            self.projection = simulator.simulate(self.simulations)
+
+    def refresh_calendar(self):
+        #A long-running watch or serve process can see the date change between builds,
+        #which can move athletes into a new category
+        if not self.calendar.is_current:
+            self.calendar = SeasonCalendar(self.athletes, [race.race_date for race in self.races.values()])
+            self.calendar.assign_categories()
+            self.records.calendar = self.calendar
+
+    def make_data_bundle(self):
+        if self.data_bundle:
+            self.bundle = DataBundle.from_league(
+                INDEX_PAGE, self.athletes, self.races, [self.combined_5k, self.combined_marathon], self.leaderboard)
+
     def print_tables(self):
-        for athlete in self.athletes.values():
-            if athlete.total_score:                
-                AthletePage.print_athlete_page(
-                    athlete, self.athletes, self.races,
-                    self.combined_5k.summary_page, self.combined_marathon.summary_page)
+        self.page_writer = PageWriter(signatures_path=self.signatures_path)
+        render_pages(self.render_snapshot(), self.page_writer, self.jobs)
+        self.page_writer.save()
+        print(self.page_writer.summary())
 
-        for race in self.races.values():
-            RacePage.print_race_page(race, self.athletes)
+    def run_stages(self, stages:list):
 
-        RacePage.print_combined_race_page(self.combined_5k, self.athletes, self.races)
+        if self.store_path is not None:
+            self.store = ResultsStore(self.store_path)
+        if self.factor_cache_path is not None:
+            age_factor_cache.load(self.factor_cache_path)
+        if self.archive_path is not None:
+            self.archive = SeasonArchive(self.archive_path)
 
-        RacePage.print_combined_race_page(self.combined_marathon, self.athletes, self.races)
+        cache_stats = age_factor_cache.stats()
+        try:
+            for stage in stages:
+                stage_name = stage.func.__name__ if isinstance(stage, partial) else stage.__name__
+                with self.profiler.stage(stage_name):
+                    stage()
+        finally:
+            for key, value in age_factor_cache.stats().items():
+                if key != 'size':
+                    self.profiler.count('age_factor_cache', key, value - cache_stats[key])
+            if self.store is not None:
+                self.store.close()
+                print(
+                    f'Incremental build: {self.store.races_loaded} races loaded, '
+                    f'{self.store.races_restored} restored from {self.store_path}')
+                self.store = None #type: ignore
+            if self.factor_cache_path is not None:
+                age_factor_cache.save(self.factor_cache_path)
 
-        IndexPage.print_index_page(
-            Path() / 'docs' / 'index.html', self.athletes, self.races.values(), self.combined_5k, self.combined_marathon
-        )
-        
+    def score_league(self):
+        #Load and score everything, without writing any pages
+        self.run_stages([
+            self.load_athletes,
+            self.load_races,
+            self.make_combined_5k,
+            self.make_combined_marathon,
+            self.update_athlete_scores,
+            self.make_leaderboard,
+            self.make_projections,
+            self.make_data_bundle])
 
     def process_races(self):
+        self.run_stages([
+            self.load_athletes,
+            self.load_races,
+            self.make_combined_5k,
+            self.make_combined_marathon,
+            self.update_athlete_scores,
+            self.make_leaderboard,
+            self.make_projections,
+            self.make_data_bundle,
+            self.archive_season,
+            self.print_tables])
+
+    def rescore_races(self, race_names:list[str]):
+        #Reload the given races and rescore only what they can affect: their entrants,
+        #and the combined leaderboards if any entrant's best 5k or marathon changed.
+        #Totals are recorded first so we can report exactly whose total moved
+        affected = {race_entry.athlete for name in race_names for race_entry in self.races[name].athletes}
+        combined_athletes = {
+            race_entry.athlete for race_entry in self.combined_5k.athletes + self.combined_marathon.athletes}
+        totals_before = {name: self.athletes[name].total_score for name in affected | combined_athletes}
+        bests_before = {name: (self.athletes[name].best_5k, self.athletes[name].best_marathon) for name in affected}
+
+        self.reload_races(race_names)
+
+        #Athletes new to these races haven't been rescored yet, so still have their old totals
+        affected |= {race_entry.athlete for name in race_names for race_entry in self.races[name].athletes}
+        for name in affected - totals_before.keys():
+            totals_before[name] = self.athletes[name].total_score
+
+        best_5k_changed = any(
+            self.athletes[name].best_5k is not bests_before.get(name, (None, None))[0] for name in affected)
+        best_marathon_changed = any(
+            self.athletes[name].best_marathon is not bests_before.get(name, (None, None))[1] for name in affected)
+
+        #An entry that is no longer its athlete's best drops off the combined leaderboard,
+        #so loses its combined scores, as it would never have had them in a full build
+        for race_entry in self.combined_5k.athletes:
+            if self.athletes[race_entry.athlete].best_5k is not race_entry:
+                race_entry.time_score = race_entry.age_pct_score = 0
+        for race_entry in self.combined_marathon.athletes:
+            if self.athletes[race_entry.athlete].best_marathon is not race_entry:
+                race_entry.time_score = race_entry.age_pct_score = 0
+        if best_5k_changed:
+            self.make_combined_5k()
+            affected |= {race_entry.athlete for race_entry in self.combined_5k.athletes}
+        if best_marathon_changed:
+            self.make_combined_marathon()
+            affected |= {race_entry.athlete for race_entry in self.combined_marathon.athletes}
+
+        for name in affected:
+            self.athletes[name].update_scores_lists()
+
+        self.changed_athletes = {
+            name for name in affected if self.athletes[name].total_score != totals_before[name]}
+
+    def update_races(self, race_names:list[str])->set[str]:
+        #Reload just the given races, then rescore and re-render what depends on them,
+        #returning the names of the athletes whose total score changed
+        self.run_stages([
+            self.refresh_calendar,
+            partial(self.rescore_races, race_names),
+            self.make_leaderboard,
+            self.make_projections,
+            self.make_data_bundle,
+            self.archive_season,
+            self.print_tables])
+        return self.changed_athletes
+
+    def render_snapshot(self)->RenderSnapshot:
+        return RenderSnapshot(
+            self.athletes, self.races, self.combined_5k, self.combined_marathon, self.leaderboard, self.records,
+            self.season, self.projection, self.archive, self.bundle, self.league)
 
-        self.load_athletes()
-        self.load_races()
-        self.make_combined_5k()
-        self.make_combined_marathon()
-        self.update_athlete_scores()
-        self.print_tables()
\ No newline at end of file
+    def profile_report(self)->dict:
+        timings = self.profiler.timings
+        counts = self.profiler.counts
+        stages = timings.get('stages', {})
+        races = {
+            name: {
+                'load': timings.get('race_load', {}).get(name, 0.0),
+                'score': timings.get('race_score', {}).get(name, 0.0),
+                'entries': counts.get('race_entries', {}).get(name, 0),
+            }
+            for name in timings.get('race_load', {})
+        }
+        report = {
+            'total_time': sum(stages.values()),
+            'stages': stages,
+            'races': races,
+            'race_counts': counts.get('races', {}),
+            'age_grading': {
+                #Every cache miss is a call to the underlying AgeGrader
+                'age_grader_calls': counts.get('age_factor_cache', {}).get('misses', 0),
+                'factor_cache': counts.get('age_factor_cache', {}),
+            },
+        }
+        if self.page_writer is not None:
+            report['pages'] = {
+                'rendered': self.page_writer.pages_rendered,
+                'written': self.page_writer.pages_written,
+                'unchanged': self.page_writer.pages_unchanged,
+                'skipped': self.page_writer.pages_skipped,
+                'render_times': self.page_writer.render_times,
+                'render_counts': self.page_writer.render_counts,
+            }
+        return report
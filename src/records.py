@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+from typing import Iterable
+
+from src.athlete import Athlete, age_category, category_order
+from src.race import Race
+from src.race_entry import MARATHON_KM, RaceEntry
+from src.season_calendar import SeasonCalendar
+from src.utils import distance_in_kms, years_since
+
+STANDARD_DISTANCES = {
+    '5k': distance_in_kms('5 km'),
+    '5 mile': distance_in_kms('5 mi'),
+    '10k': distance_in_kms('10 km'),
+    '10 mile': distance_in_kms('10 mi'),
+    'Half marathon': distance_in_kms('21.0975 km'),
+    'Marathon': MARATHON_KM,
+}
+#Relative difference allowed between a race's listed distance and the standard, so
+#eg a '13.1 mi' half marathon still counts
+DISTANCE_TOLERANCE = 0.005
+
+def standard_distance(distance:float)->str:
+    #The name of the standard distance a race matches, or None
+    for name, standard in STANDARD_DISTANCES.items():
+        if abs(distance - standard) <= DISTANCE_TOLERANCE * standard:
+            return name
+    return None #type: ignore
+
+@dataclass
+class RecordsIndex:
+    #The fastest entry for each athlete and each (gender, age category) at every standard
+    #distance, kept up to date as entries are added, so any record is a dict lookup.
+    #Categories are the athlete's age on the day of the race, from the calendar if given
+    calendar:SeasonCalendar = None #type: ignore
+
+    def __post_init__(self):
+        self.personal_bests:dict[tuple[str,str],RaceEntry] = {}
+        self.club_records:dict[tuple[str,bool,str],RaceEntry] = {}
+        self.race_categories:dict[tuple[str,str],str] = {}
+
+    def add(self, race_entry:RaceEntry, athlete:Athlete):
+        distance = standard_distance(race_entry.distance)
+        if distance is None:
+            return
+
+        if self.calendar is not None:
+            category = self.calendar.category(athlete.name, race_entry.race_date)
+        else:
+            category = age_category(years_since(athlete.dob, race_entry.race_date))
+        self.race_categories[(race_entry.athlete, race_entry.race_name)] = category
+        for records, key in (
+            (self.personal_bests, (race_entry.athlete, distance)),
+            (self.club_records, (distance, race_entry.male, category)),
+            (self.club_records, (distance, race_entry.male, ''))):
+            #Strictly faster, so on a tie the first to run the time keeps the record
+            if key not in records or race_entry.time < records[key].time:
+                records[key] = race_entry
+
+    def add_race(self, race:Race, athletes:dict[str,Athlete]):
+        for race_entry in race.athletes:
+            self.add(race_entry, athletes[race_entry.athlete])
+
+    @staticmethod
+    def from_races(
+        races:Iterable[Race], athletes:dict[str,Athlete], calendar:SeasonCalendar=None)->'RecordsIndex': #type: ignore
+        records = RecordsIndex(calendar)
+        for race in races:
+            records.add_race(race, athletes)
+        return records
+
+    def personal_best(self, athlete_name:str, distance:str)->RaceEntry:
+        return self.personal_bests.get((athlete_name, distance)) #type: ignore
+
+    def club_record(self, distance:str, male:bool, category:str='')->RaceEntry:
+        #The gender's record across all categories if no category is given
+        return self.club_records.get((distance, male, category)) #type: ignore
+
+    def record_category(self, race_entry:RaceEntry)->str:
+        return self.race_categories[(race_entry.athlete, race_entry.race_name)]
+
+    def record_keys(self, distance:str)->list[tuple[bool,str]]:
+        #(male, category) of each record at the distance, men first, youngest category first
+        return sorted(
+            [(male, category) for record_distance, male, category in self.club_records if record_distance == distance],
+            key=lambda key:(not key[0], category_order(key[1]) if key[1] else -1))
@@ -0,0 +1,101 @@
+from pathlib import Path
+
+from src.athlete import Athlete
+from src.race import Race
+from src.race_entry import RaceEntry
+from src.records import STANDARD_DISTANCES, RecordsIndex
+
+import src.html_pages as hp
+from src.page_writer import PageWriter
+from src.utils import date_to_str, secs_to_time_str
+
+CLUB_RECORDS_PAGE = Path() / 'docs' / 'records.html'
+PERSONAL_BESTS_PAGE = Path() / 'docs' / 'personal_bests.html'
+
+class RecordsPage:
+
+    @staticmethod
+    def club_record_rows(
+        records:RecordsIndex, distance:str, all_athletes:dict[str,Athlete], all_races:dict[str,Race])->list[list]:
+
+        def record_cols(male:bool, category:str)->list:
+            race_entry = records.club_record(distance, male, category)
+            athlete = all_athletes[race_entry.athlete]
+            race = all_races[race_entry.race_name]
+            return [
+                'M' if male else 'F',
+                category or 'All',
+                hp.html_link(race_entry.athlete, athlete.summary_page),
+                secs_to_time_str(race_entry.time),
+                f'{race_entry.age_pct:3.2f}',
+                hp.html_link(race_entry.race_name, race.summary_page),
+                date_to_str(race_entry.race_date)]
+
+        return [record_cols(male, category) for male, category in records.record_keys(distance)]
+
+    @staticmethod
+    def print_club_records_page(
+        records:RecordsIndex, all_athletes:dict[str,Athlete], all_races:dict[str,Race],
+        writer:PageWriter=None): #type: ignore
+
+        if writer is None:
+            writer = PageWriter()
+        tables = {
+            distance: RecordsPage.club_record_rows(records, distance, all_athletes, all_races)
+            for distance in STANDARD_DISTANCES}
+        if not writer.needs_update(CLUB_RECORDS_PAGE, tuple(tables.items())):
+            return
+
+        with writer.open(CLUB_RECORDS_PAGE) as file_id:
+            hp.html_header('ADAC Road Race Championship - Club records', 'css/styles.css', file_id)
+            hp.html_h('ADAC Road Race Championship', 1, file=file_id)
+            hp.html_h('Club records', 2, file=file_id)
+            hp.html_p(
+                'Fastest times this season at each standard distance, by gender and by age category '
+                'on the day of the race.', file=file_id)
+            for distance, rows in tables.items():
+                if not rows:
+                    continue
+                hp.html_h(distance, 3, file=file_id)
+                hp.html_start_table(
+                    ['Gender  ', 'Category  ', 'Athlete', 'Time', 'Age %', 'Race', 'Date'], file=file_id)
+                hp.html_table_rows(rows, file=file_id)
+                hp.html_end_table(file=file_id)
+            hp.html_p(hp.html_link('<br><br>Home', Path('index.html')), file=file_id)
+            hp.html_footer(file_id, 'scripts/filters.js')
+
+    @staticmethod
+    def print_personal_bests_page(
+        records:RecordsIndex, all_athletes:dict[str,Athlete], writer:PageWriter=None): #type: ignore
+
+        if writer is None:
+            writer = PageWriter()
+
+        def pb_str(race_entry:RaceEntry)->str:
+            return secs_to_time_str(race_entry.time) if race_entry is not None else ''
+
+        def table_row_cols(athlete:Athlete)->list:
+            return [
+                hp.html_link(athlete.name, athlete.summary_page),
+                'M' if athlete.male else 'F',
+                athlete.age_category,
+                *[pb_str(records.personal_best(athlete.name, distance)) for distance in STANDARD_DISTANCES]]
+
+        athletes_with_pbs = {athlete_name for athlete_name, _ in records.personal_bests}
+        rows = [
+            table_row_cols(athlete) for athlete in sorted(all_athletes.values(), key=lambda a:a.name)
+            if athlete.name in athletes_with_pbs]
+        if not writer.needs_update(PERSONAL_BESTS_PAGE, rows):
+            return
+
+        with writer.open(PERSONAL_BESTS_PAGE) as file_id:
+            hp.html_header('ADAC Road Race Championship - Personal bests', 'css/styles.css', file_id)
+            hp.html_h('ADAC Road Race Championship', 1, file=file_id)
+            hp.html_h('Personal bests', 2, file=file_id)
+            hp.html_p("Each athlete's fastest time this season at each standard distance.", file=file_id)
+            hp.html_start_table(
+                ['Athlete', 'Gender  ', 'Category  ', *STANDARD_DISTANCES], file=file_id)
+            hp.html_table_rows(rows, file=file_id)
+            hp.html_end_table(file=file_id)
+            hp.html_p(hp.html_link('<br><br>Home', Path('index.html')), file=file_id)
+            hp.html_footer(file_id, 'scripts/filters.js')
@@ -0,0 +1,137 @@
+import csv
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+from src.name_resolver import NameMatch, NameResolver
+from src.utils import time_str_to_secs
+
+CLUB_NAMES = ['Altrincham']
+#Results files often have a title or blank lines before the column headers
+HEADER_SEARCH_ROWS = 10
+
+#Recognised column headers (lower case) in order of preference, eg chip time over gun time
+NAME_HEADERS = ['name', 'full name', 'runner', 'athlete']
+FIRST_NAME_HEADERS = ['first name', 'firstname', 'forename', 'first']
+LAST_NAME_HEADERS = ['last name', 'lastname', 'surname', 'last']
+TIME_HEADERS = ['chip time', 'net time', 'nett time', 'time', 'finish time', 'gun time']
+CLUB_HEADERS = ['club', 'club name', 'team', 'affiliation']
+
+class ResultsColumns(NamedTuple):
+    first_name:int
+    last_name:int
+    name:int
+    time:int
+    club:int
+
+    @staticmethod
+    def detect(header:list[str])->'ResultsColumns':
+        #The columns we need from a header row, or None if it isn't one
+        headers = [field.strip().lower() for field in header]
+
+        def find(candidates:list[str])->int:
+            for candidate in candidates:
+                if candidate in headers:
+                    return headers.index(candidate)
+            return None #type: ignore
+
+        columns = ResultsColumns(
+            find(FIRST_NAME_HEADERS), find(LAST_NAME_HEADERS), find(NAME_HEADERS),
+            find(TIME_HEADERS), find(CLUB_HEADERS))
+        has_name = columns.name is not None or (columns.first_name is not None and columns.last_name is not None)
+        if not has_name or columns.time is None or columns.club is None:
+            return None #type: ignore
+        return columns
+
+    def row_name(self, row:list[str])->str:
+        if self.first_name is not None and self.last_name is not None:
+            return f'{row[self.first_name].strip()} {row[self.last_name].strip()}'
+        return row[self.name].strip()
+
+def club_matcher(club_names:list[str])->re.Pattern:
+    #Clubs are matched on how their name starts, eg 'Altrincham & District AC Limited'
+    return re.compile('|'.join(re.escape(name) for name in club_names), re.IGNORECASE)
+
+def iter_club_results(path:Path, matcher:re.Pattern)->Iterator[tuple[str,str]]:
+    #Stream (name, time string) for each club runner with a valid time, a row at a time
+    #so even a full marathon field is read in constant memory
+    with open(path, newline='', encoding='utf-8-sig') as file_id:
+        reader = csv.reader(file_id)
+        columns = None
+        n_columns = 0
+        for row in reader:
+            if columns is None:
+                columns = ResultsColumns.detect(row)
+                if columns is None and reader.line_num >= HEADER_SEARCH_ROWS:
+                    raise ValueError(f'{path}: no header row with name, time and club columns found')
+                if columns is not None:
+                    n_columns = max(column for column in columns if column is not None) + 1
+                continue
+
+            #Short rows are usually DNFs or notes
+            if len(row) < n_columns:
+                continue
+            if not matcher.match(row[columns.club].strip()):
+                continue
+            race_time = row[columns.time].strip()
+            try:
+                time_str_to_secs(race_time)
+            except ValueError:
+                continue
+
+            yield columns.row_name(row), race_time
+
+        if columns is None:
+            raise ValueError(f'{path}: no header row with name, time and club columns found')
+
+@dataclass
+class ImportResult:
+    input_path:Path
+    output_path:Path
+    n_runners:int
+    #Names that weren't an exact match for an athlete, to be checked
+    matches:list[NameMatch] = field(default_factory=list)
+
+def import_results(
+    input_path:Path, output_path:Path, matcher:re.Pattern, resolver:NameResolver)->ImportResult:
+    #Write the club's results in the race CSV format read by Race.load_race, with names
+    #resolved to the athlete list. Names that don't resolve for certain are kept as they
+    #are, so a suggested match is only scored once it's added to the alias table
+    result = ImportResult(input_path, output_path, 0)
+    with open(output_path, 'wt') as file_id:
+        for name, race_time in iter_club_results(input_path, matcher):
+            match = resolver.resolve(name)
+            if match.method != 'exact':
+                result.matches.append(match)
+            if match.method == 'dropped':
+                continue
+            file_id.write(f'{match.athlete if match.is_certain else name}, {race_time}\n')
+            result.n_runners += 1
+    return result
+
+def results_file_name(input_path:Path)->str:
+    #eg 'Sale-Sizzler-1-2025-Final-Thu 19 Jun 2025.csv' -> 'sale_sizzler_1_2025_final_thu_19_jun_2025_results.csv'
+    return re.sub(r'[^a-z0-9]+', '_', input_path.stem.lower()).strip('_') + '_results.csv'
+
+_worker_resolver:NameResolver = None #type: ignore
+
+def _init_worker(resolver:NameResolver):
+    global _worker_resolver
+    _worker_resolver = resolver
+
+def _import_file(args:tuple[Path,Path,re.Pattern])->ImportResult:
+    return import_results(*args, _worker_resolver)
+
+def import_directory(
+    input_dir:Path, output_dir:Path, matcher:re.Pattern, resolver:NameResolver, jobs:int=1)->list[ImportResult]:
+    #Import every CSV in the directory, across a process pool as the files are independent.
+    #The resolver is sent to each worker once rather than with every file
+    input_paths = sorted(input_dir.glob('*.csv'))
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tasks = [(input_path, output_dir / results_file_name(input_path), matcher) for input_path in input_paths]
+    if jobs <= 1:
+        return [import_results(*task, resolver) for task in tasks]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(resolver,)) as executor:
+        return list(executor.map(_import_file, tasks))
@@ -0,0 +1,129 @@
+import hashlib
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.athlete import Athlete
+from src.name_resolver import NameResolver
+from src.race import Race
+from src.race_entry import agegrader_version
+from src.utils import date_from_str, date_to_str
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS races (
+    race_name TEXT PRIMARY KEY,
+    race_key TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    race_name TEXT NOT NULL,
+    athlete TEXT NOT NULL,
+    dob TEXT NOT NULL,
+    male INTEGER NOT NULL,
+    time INTEGER NOT NULL,
+    age_pct REAL,
+    time_score INTEGER NOT NULL,
+    age_pct_score INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_race ON entries (race_name);
+CREATE TABLE IF NOT EXISTS unmatched (
+    race_name TEXT NOT NULL,
+    athlete TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS unmatched_race ON unmatched (race_name);
+'''
+
+def race_key(race:Race, resolver:NameResolver, grader_version:str)->str:
+    #Key on everything from the race_list row that affects the results, the contents of
+    #the race CSV itself, the athlete names and alias table its names are matched with,
+    #and the version of the age grading tables its age grades came from
+    hasher = hashlib.sha256()
+    hasher.update(resolver.key().encode())
+    hasher.update(grader_version.encode())
+    row = (
+        f'{race.name}|{race.distance!r}|{date_to_str(race.race_date)}|'
+        f'{int(race.is_5k)}|{int(race.is_marathon)}|{race.race_path.as_posix()}')
+    hasher.update(row.encode())
+    hasher.update(race.race_path.read_bytes())
+    return hasher.hexdigest()
+
+@dataclass
+class ResultsStore:
+    store_path:Path
+    races_loaded:int = 0
+    races_restored:int = 0
+
+    def __post_init__(self):
+        self.connection = sqlite3.connect(self.store_path)
+        self.connection.executescript(SCHEMA)
+        #Without a version to compare there's no telling if the stored age grades are
+        #current, so every race is reloaded
+        self.grader_version = agegrader_version()
+        if not self.grader_version:
+            print(f'Not restoring races from {self.store_path}: the agegrader version could not be found')
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def restore_race(self, race:Race, athletes:dict[str,Athlete], resolver:NameResolver)->bool:
+        if not self.grader_version:
+            return False
+        key = race_key(race, resolver, self.grader_version)
+        row = self.connection.execute(
+            'SELECT race_key FROM races WHERE race_name = ?', (race.name,)).fetchone()
+        if row is None or row[0] != key:
+            return False
+
+        #Names that failed to match last time must still fail to match, otherwise
+        #the athlete list has changed and the race needs reparsing
+        unmatched = self.connection.execute(
+            'SELECT athlete FROM unmatched WHERE race_name = ?', (race.name,)).fetchall()
+        if any(
+            match.is_certain and match.athlete in athletes
+            for match in (resolver.resolve(name) for name, in unmatched)):
+            return False
+
+        entries = self.connection.execute(
+            'SELECT athlete, dob, male, time, age_pct, time_score, age_pct_score '
+            'FROM entries WHERE race_name = ? ORDER BY rowid', (race.name,)).fetchall()
+
+        #The stored age grades are only valid if the athlete details they were
+        #computed from are unchanged
+        for name, dob, male, *_ in entries:
+            athlete = athletes.get(name)
+            if athlete is None or athlete.dob != date_from_str(dob) or athlete.male != bool(male):
+                return False
+
+        race.restore_entries(
+            athletes,
+            [(name, time, float('nan') if age_pct is None else age_pct, time_score, age_pct_score)
+                for name, _, _, time, age_pct, time_score, age_pct_score in entries])
+        self.races_restored += 1
+        return True
+
+    def save_race(self, race:Race, athletes:dict[str,Athlete], resolver:NameResolver, unmatched:list[str]):
+        with self.connection:
+            self.connection.execute('DELETE FROM entries WHERE race_name = ?', (race.name,))
+            self.connection.execute('DELETE FROM unmatched WHERE race_name = ?', (race.name,))
+            self.connection.executemany(
+                'INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (race.name, entry.athlete, date_to_str(athletes[entry.athlete].dob), int(entry.male),
+                     entry.time, entry.age_pct, entry.time_score, entry.age_pct_score)
+                    for entry in race.athletes
+                ])
+            self.connection.executemany(
+                'INSERT INTO unmatched VALUES (?, ?)', [(race.name, name) for name in unmatched])
+            self.connection.execute(
+                'INSERT OR REPLACE INTO races VALUES (?, ?)',
+                (race.name, race_key(race, resolver, self.grader_version)))
+        self.races_loaded += 1
+
+    def prune(self, race_names:list[str]):
+        #Drop any stored races that are no longer in the race list
+        stored = [name for name, in self.connection.execute('SELECT race_name FROM races')]
+        with self.connection:
+            for name in set(stored) - set(race_names):
+                self.connection.execute('DELETE FROM races WHERE race_name = ?', (name,))
+                self.connection.execute('DELETE FROM entries WHERE race_name = ?', (name,))
+                self.connection.execute('DELETE FROM unmatched WHERE race_name = ?', (name,))
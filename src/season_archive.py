@@ -0,0 +1,144 @@
+import json
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+from src.athlete import Athlete
+from src.entry_table import EntryTable
+from src.race import Race
+from src.race_entry import RaceEntry
+from src.records import standard_distance
+
+INDEX_FILE = 'index.json'
+
+class ArchivedEntry(NamedTuple):
+    season:int
+    race_name:str
+    race_date:date
+    distance:float
+    time:int
+    age_pct:float
+    is_club:bool
+    total_score:int
+    counting:bool
+
+    @staticmethod
+    def from_entry(season:int, race_entry:RaceEntry)->'ArchivedEntry':
+        return ArchivedEntry(
+            season, race_entry.race_name, race_entry.race_date, race_entry.distance, race_entry.time,
+            race_entry.age_pct, race_entry.is_club, race_entry.total_score, race_entry.counting)
+
+def distance_label(distance:float)->str:
+    return standard_distance(distance) or f'{round(distance, 2):g} km'
+
+@dataclass
+class AthleteHistory:
+    #An athlete's results over every season they appear in, in date order
+    name:str
+    season:int
+    entries:list[ArchivedEntry]
+
+    def season_totals(self)->list[tuple[int,int,int]]:
+        #(season, number of races, total score), most recent first
+        totals:dict[int,list[int]] = {}
+        for entry in self.entries:
+            season_total = totals.setdefault(entry.season, [0, 0])
+            season_total[0] += 1
+            season_total[1] += entry.total_score if entry.counting else 0
+        return [(season, n_races, total) for season, (n_races, total) in sorted(totals.items(), reverse=True)]
+
+    def personal_bests(self)->list[ArchivedEntry]:
+        #Fastest time at each distance, shortest distance first. Races within the
+        #tolerance of a standard distance count as that distance
+        bests:dict[str,ArchivedEntry] = {}
+        for entry in self.entries:
+            key = distance_label(entry.distance)
+            if key not in bests or entry.time < bests[key].time:
+                bests[key] = entry
+        return sorted(bests.values(), key=lambda entry:entry.distance)
+
+    def previous_entries(self)->list[ArchivedEntry]:
+        return [entry for entry in self.entries if entry.season < self.season]
+
+@dataclass
+class SeasonArchive:
+    #Each season's scored results as an EntryTable file, plus an index of which
+    #athletes appear in which season. Seasons are only loaded when a page needs one
+    root:Path
+
+    def __post_init__(self):
+        self.index_path = self.root / INDEX_FILE
+        self.index:dict[str,dict] = {}
+        if self.index_path.exists():
+            self.index = json.loads(self.index_path.read_text())
+        self.tables:dict[int,EntryTable] = {}
+        self.athlete_seasons:dict[str,list[int]] = {}
+        for season, season_index in self.index.items():
+            for name in season_index['athletes']:
+                self.athlete_seasons.setdefault(name, []).append(int(season))
+
+    def __getstate__(self):
+        #Worker processes load the seasons they need themselves
+        return {'root': self.root}
+
+    def __setstate__(self, state:dict):
+        self.root = state['root']
+        self.__post_init__()
+
+    @property
+    def seasons(self)->list[int]:
+        return sorted(int(season) for season in self.index)
+
+    def season_path(self, season:int)->Path:
+        return self.root / f'season_{season}.npz'
+
+    def season_table(self, season:int)->EntryTable:
+        if season not in self.tables:
+            self.tables[season] = EntryTable.load(self.season_path(season))
+        return self.tables[season]
+
+    def save_season(self, season:int, athletes:dict[str,Athlete], races:Iterable[Race]):
+        #Replace the season's results, eg the current season after every build
+        races = [race for race in races if race.athletes]
+        table = EntryTable.from_races(athletes, races)
+        self.root.mkdir(parents=True, exist_ok=True)
+        table.save(self.season_path(season))
+        self.tables[season] = table
+
+        for seasons in self.athlete_seasons.values():
+            if season in seasons:
+                seasons.remove(season)
+        entered = {race_entry.athlete for race in races for race_entry in race.athletes}
+        for name in entered:
+            self.athlete_seasons.setdefault(name, []).append(season)
+            self.athlete_seasons[name].sort()
+        self.index[str(season)] = {
+            'file': self.season_path(season).name,
+            'races': len(races),
+            'entries': len(table),
+            'athletes': sorted(entered)}
+        self.index_path.write_text(json.dumps(self.index, indent=1, sort_keys=True))
+
+    def archived_entries(self, name:str, season:int)->list[ArchivedEntry]:
+        table = self.season_table(season)
+        entries = table.athlete_entries(name)
+        race_data = table.race_data[entries['race']]
+        is_club = ~(race_data['is_5k'] | race_data['is_marathon'])
+        total_scores = entries['time_score'].astype(int) + entries['age_pct_score']
+        return [
+            ArchivedEntry(season, table.race_names[i_race], race_date, distance, time, age_pct, club, score, counting)
+            for i_race, race_date, distance, time, age_pct, club, score, counting in zip(
+                entries['race'].tolist(), race_data['race_date'].tolist(), race_data['distance'].tolist(),
+                entries['time'].tolist(), entries['age_pct'].tolist(), is_club.tolist(), total_scores.tolist(),
+                entries['counting'].tolist())]
+
+    def athlete_history(self, athlete:Athlete, season:int)->AthleteHistory:
+        #Earlier seasons from the archive, the current season from the live results
+        entries = []
+        for archived_season in self.athlete_seasons.get(athlete.name, []):
+            if archived_season < season:
+                entries += self.archived_entries(athlete.name, archived_season)
+        entries += [ArchivedEntry.from_entry(season, race_entry) for race_entry in athlete.races]
+        entries.sort(key=lambda entry:entry.race_date)
+        return AthleteHistory(athlete.name, season, entries)
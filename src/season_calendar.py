@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable
+
+import numpy as np
+
+from src.athlete import Athlete
+from src.utils import years_since_batch
+
+JUNIOR_SENIOR = ['U17', 'U20', 'Senior']
+#Age each of the junior and senior categories runs up to, then veteran categories every 5 years
+CATEGORY_AGES = [17, 20, 35]
+VETERAN_YEARS = 5
+
+def category_codes(ages:np.ndarray)->np.ndarray:
+    #Index into category_labels of the category for each age, as athlete.age_category
+    codes = np.searchsorted(CATEGORY_AGES, ages, side='right')
+    veteran = codes == len(CATEGORY_AGES)
+    codes[veteran] += ages[veteran] // VETERAN_YEARS - CATEGORY_AGES[-1] // VETERAN_YEARS
+    return codes
+
+def category_labels(max_age:int)->list[str]:
+    first_veteran = CATEGORY_AGES[-1] // VETERAN_YEARS
+    return JUNIOR_SENIOR + [
+        f'V{VETERAN_YEARS*veteran}' for veteran in range(first_veteran, max_age // VETERAN_YEARS + 1)]
+
+@dataclass
+class SeasonCalendar:
+    #Every athlete's age on every race date of the season (and today), and the category
+    #that puts them in, worked out once as (athletes x dates) integer arrays so pages,
+    #age grading and records just index into them. Today is fixed when the calendar is
+    #built, so a long-running process should rebuild it once it's out of date
+    athletes:dict[str,Athlete]
+    race_dates:Iterable[date]
+    today:date = None #type: ignore
+
+    def __post_init__(self):
+        if self.today is None:
+            self.today = date.today()
+        self.dates = sorted(set(self.race_dates) | {self.today})
+        self.date_index = {race_date: i_date for i_date, race_date in enumerate(self.dates)}
+        self.athlete_index = {name: i_athlete for i_athlete, name in enumerate(self.athletes)}
+
+        dobs = [athlete.dob for athlete in self.athletes.values()]
+        self.ages = np.zeros((len(dobs), len(self.dates)), dtype=np.int16)
+        for i_date, race_date in enumerate(self.dates):
+            self.ages[:, i_date] = years_since_batch(dobs, race_date)
+        self.categories = category_codes(self.ages).astype(np.int8)
+        self.labels = category_labels(int(self.ages.max(initial=0)))
+
+    @property
+    def is_current(self)->bool:
+        return self.today == date.today()
+
+    def age(self, athlete_name:str, on_date:date)->int:
+        return int(self.ages[self.athlete_index[athlete_name], self.date_index[on_date]])
+
+    def ages_on(self, athlete_names:list[str], on_date:date)->np.ndarray:
+        rows = [self.athlete_index[name] for name in athlete_names]
+        return self.ages[rows, self.date_index[on_date]]
+
+    def category(self, athlete_name:str, on_date:date=None)->str: #type: ignore
+        #The category on the given date, or the championship category (as of today)
+        i_date = self.date_index[on_date if on_date is not None else self.today]
+        return self.labels[self.categories[self.athlete_index[athlete_name], i_date]]
+
+    def assign_categories(self):
+        #The championship category is read for every table row, so give each athlete theirs
+        i_today = self.date_index[self.today]
+        for name, athlete in self.athletes.items():
+            athlete.current_category = self.labels[self.categories[self.athlete_index[name], i_today]]
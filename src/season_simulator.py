@@ -0,0 +1,255 @@
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+from src.athlete import Athlete, TOTAL_RACES
+from src.race import MAX_PTS, Race
+from src.race_entry import age_pct_batch
+from src.season_calendar import SeasonCalendar
+from src.utils import years_since_batch
+
+SIMULATION_CHUNK = 1000
+#(simulation, athlete) cells per chunk, so a big field is simulated in smaller chunks and
+#each worker's arrays stay a few tens of MB whatever the size of the field
+SIMULATION_CELLS = 2_000_000
+#Finishing in the top this many positions is reported, along with the most likely position
+TOP_POSITIONS = 3
+#Age grade % points, even the most consistent runners vary this much race to race
+MIN_SPREAD = 2.0
+
+@dataclass
+class SimulationInputs:
+    #Everything a simulation needs as flat arrays over the athletes in the field, so it
+    #pickles cheaply to the worker processes
+    males:np.ndarray
+    groups:list[np.ndarray]
+    required_scores:np.ndarray
+    pool_totals:np.ndarray
+    participation:np.ndarray
+    mean_pcts:np.ndarray
+    spread_pcts:np.ndarray
+    standards:np.ndarray
+
+@dataclass
+class PositionCounts:
+    #How often each athlete finished in each of the top positions, and the position they
+    #finished in most often
+    top:np.ndarray
+    likely:np.ndarray
+
+    @staticmethod
+    def from_counts(keys:np.ndarray, counts:np.ndarray, n_athletes:int)->'PositionCounts':
+        athletes, positions = np.divmod(keys, n_athletes + 1)
+        top = np.zeros((n_athletes, TOP_POSITIONS), dtype=int)
+        in_top = positions <= TOP_POSITIONS
+        top[athletes[in_top], positions[in_top] - 1] = counts[in_top]
+
+        #The most common position, the highest of any tied
+        order = np.lexsort((positions, -counts, athletes))
+        first = order[np.flatnonzero(np.diff(athletes[order], prepend=-1))]
+        likely = np.ones(n_athletes, dtype=int)
+        likely[athletes[first]] = positions[first]
+        return PositionCounts(top, likely)
+
+@dataclass
+class Projection:
+    names:list[str]
+    categories:list[str]
+    future_races:list[str]
+    n_simulations:int
+    current_totals:np.ndarray
+    expected_totals:np.ndarray
+    overall_positions:PositionCounts
+    category_positions:PositionCounts
+
+    def position_probability(self, positions:PositionCounts, i_athlete:int, top:int=1)->float:
+        return float(positions.top[i_athlete, :top].sum()) / self.n_simulations
+
+    def likely_position(self, positions:PositionCounts, i_athlete:int)->int:
+        return int(positions.likely[i_athlete])
+
+def rank_ascending(keys:np.ndarray)->np.ndarray:
+    #0 based rank of each column within its row, ties broken by column order as a
+    #stable sort of the race entries would
+    ranks = np.empty(keys.shape, dtype=int)
+    order = np.argsort(keys, axis=1, kind='stable')
+    np.put_along_axis(ranks, order, np.arange(keys.shape[1]), axis=1)
+    return ranks
+
+def competition_positions(totals:np.ndarray)->np.ndarray:
+    #One more than the number that scored more in the same simulation, matching
+    #Leaderboard.rank. Offsetting each row lets a single sort and search do every row
+    n_sims, n_athletes = totals.shape
+    offsets = (totals.max(initial=0) + 1) * np.arange(n_sims)[:, None]
+    offset_totals = totals + offsets
+    sorted_totals = np.sort(offset_totals, axis=None)
+    row_ends = n_athletes * np.arange(1, n_sims+1)[:, None]
+    n_ahead = row_ends - np.searchsorted(sorted_totals, offset_totals, side='right')
+    return n_ahead + 1
+
+def position_counts(positions:np.ndarray, n_athletes:int, columns:np.ndarray)->tuple[np.ndarray,np.ndarray]:
+    #How often each athlete finished in each position, as (athlete, position) keys and
+    #counts. Each athlete only finishes in a narrow range of positions, so this is far
+    #smaller than an athletes x positions table
+    keys = columns[None, :] * (n_athletes + 1) + positions
+    return np.unique(keys, return_counts=True)
+
+def merge_counts(counts:list[tuple[np.ndarray,np.ndarray]])->tuple[np.ndarray,np.ndarray]:
+    if not counts:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    keys, inverse = np.unique(np.concatenate([keys for keys, _ in counts]), return_inverse=True)
+    totals = np.bincount(inverse, weights=np.concatenate([counts for _, counts in counts]), minlength=len(keys))
+    return keys, totals.astype(int)
+
+def best_totals(pool_totals:np.ndarray, race_scores:np.ndarray)->np.ndarray:
+    #The sum of the best races from the scores already in (pool_totals[:, k] being the sum
+    #of each athlete's best k) and the simulated ones, without building the combined pool
+    #for every simulation. Both are in descending order, so the best n_counting take
+    #the best k simulated and the best n_counting - k already in, for some k
+    n_counting = pool_totals.shape[1] - 1
+    n_sims, n_athletes, n_races = race_scores.shape
+    best = np.broadcast_to(pool_totals[:, n_counting], (n_sims, n_athletes)).copy()
+    sorted_scores = -np.sort(-race_scores, axis=2)
+    simulated = np.zeros((n_sims, n_athletes), dtype=int)
+    for k in range(1, min(n_races, n_counting) + 1):
+        simulated += sorted_scores[:, :, k-1]
+        np.maximum(best, simulated + pool_totals[:, n_counting - k], out=best)
+    return best
+
+def simulate_chunk(inputs:SimulationInputs, n_sims:int, seed:np.random.SeedSequence):
+    rng = np.random.default_rng(seed)
+    n_athletes = len(inputs.males)
+    race_scores = []
+    for standards in inputs.standards:
+        running = rng.random((n_sims, n_athletes)) < inputs.participation
+        age_pcts = np.maximum(rng.normal(inputs.mean_pcts, inputs.spread_pcts, (n_sims, n_athletes)), 1.0)
+        times = np.where(running, standards / age_pcts, np.inf)
+
+        #Score as Race.assign_scores does, time within gender and age grade overall
+        time_scores = np.zeros((n_sims, n_athletes), dtype=int)
+        for male in (True, False):
+            columns = np.flatnonzero(inputs.males == male)
+            time_scores[:, columns] = np.maximum(MAX_PTS - rank_ascending(times[:, columns]), 0)
+        age_pct_scores = np.maximum(MAX_PTS - rank_ascending(np.where(running, -age_pcts, np.inf)), 0)
+        race_scores.append(np.where(running, time_scores + age_pct_scores, 0))
+
+    #Count the best races as Athlete.update_scores_lists does
+    race_scores = np.stack(race_scores, axis=2) if race_scores else np.zeros((n_sims, n_athletes, 0), dtype=int)
+    totals = inputs.required_scores + best_totals(inputs.pool_totals, race_scores)
+
+    overall = position_counts(competition_positions(totals), n_athletes, np.arange(n_athletes))
+    category = merge_counts([
+        position_counts(competition_positions(totals[:, columns]), n_athletes, columns)
+        for columns in inputs.groups])
+    return totals.sum(axis=0), overall, category
+
+_worker_inputs:SimulationInputs = None #type: ignore
+
+def _init_worker(inputs:SimulationInputs):
+    global _worker_inputs
+    _worker_inputs = inputs
+
+def _simulate_worker_chunk(args:tuple[int,np.random.SeedSequence]):
+    return simulate_chunk(_worker_inputs, *args)
+
+@dataclass
+class SeasonSimulator:
+    #Monte Carlo projection of the final standings. Each simulation draws who runs each
+    #remaining club race from the athlete's attendance so far, and their age grade from
+    #their history, then scores the races and counts the best as the real pipeline does.
+    #The combined 5k and marathon leaderboards are taken as they stand
+    athletes:dict[str,Athlete]
+    races:dict[str,Race]
+    jobs:int = 1
+    seed:int = 0
+    calendar:SeasonCalendar = None #type: ignore
+
+    def __post_init__(self):
+        self.field = [athlete for athlete in self.athletes.values() if athlete.races]
+        self.future_races = [
+            race for race in self.races.values() if not race.in_past and not (race.is_5k or race.is_marathon)]
+
+    def simulation_inputs(self)->SimulationInputs:
+        n_past_club = sum(1 for race in self.races.values() if race.in_past and not (race.is_5k or race.is_marathon))
+        males = np.array([athlete.male for athlete in self.field], dtype=bool)
+
+        groups:dict[tuple[bool,str],list[int]] = {}
+        for i_athlete, athlete in enumerate(self.field):
+            groups.setdefault((athlete.male, athlete.age_category), []).append(i_athlete)
+
+        required_scores = np.zeros(len(self.field), dtype=int)
+        pools = []
+        participation = np.zeros(len(self.field))
+        mean_pcts = np.zeros(len(self.field))
+        spread_pcts = np.full(len(self.field), MIN_SPREAD)
+        for i_athlete, athlete in enumerate(self.field):
+            first_race, second_race = athlete.required_races
+            if first_race is not None:
+                required_scores[i_athlete] = first_race.total_score
+            other_races = athlete.club_races + ([second_race] if second_race is not None else [])
+            pools.append([race.total_score for race in other_races])
+
+            age_pcts = np.array([race.age_pct for race in athlete.races], dtype=float)
+            age_pcts = age_pcts[np.isfinite(age_pcts)]
+            if len(age_pcts):
+                participation[i_athlete] = len(athlete.club_races) / n_past_club if n_past_club else 0.5
+                mean_pcts[i_athlete] = age_pcts.mean()
+                spread_pcts[i_athlete] = max(age_pcts.std(), MIN_SPREAD)
+
+        #The sum of each athlete's best k races so far, for k up to the number that count
+        n_counting = TOTAL_RACES - 1
+        pool_totals = np.zeros((len(self.field), n_counting + 1), dtype=int)
+        for i_athlete, pool in enumerate(pools):
+            best = sorted(pool, reverse=True)[:n_counting]
+            pool_totals[i_athlete, 1:len(best)+1] = np.cumsum(best, dtype=int)
+            pool_totals[i_athlete, len(best)+1:] = pool_totals[i_athlete, len(best)]
+
+        #Time for a 100% age grade in each remaining race, divided by the drawn age grade
+        def ages_on(race_date:date)->np.ndarray:
+            if self.calendar is not None:
+                return self.calendar.ages_on([athlete.name for athlete in self.field], race_date)
+            return years_since_batch([athlete.dob for athlete in self.field], race_date)
+
+        standards = np.array([
+            age_pct_batch(ages_on(race.race_date), males, race.distance, np.ones(len(self.field)))
+            for race in self.future_races]).reshape(len(self.future_races), len(self.field))
+
+        return SimulationInputs(
+            males=males,
+            groups=[np.array(columns) for columns in groups.values()],
+            required_scores=required_scores,
+            pool_totals=pool_totals,
+            participation=participation,
+            mean_pcts=mean_pcts,
+            spread_pcts=spread_pcts,
+            standards=standards)
+
+    def simulate(self, n_simulations:int)->Projection:
+        inputs = self.simulation_inputs()
+        #Chunks are seeded independently, so the results don't depend on the number of jobs
+        chunk_size = max(1, min(SIMULATION_CHUNK, SIMULATION_CELLS // max(len(self.field), 1)))
+        chunk_sizes = [min(chunk_size, n_simulations - start) for start in range(0, n_simulations, chunk_size)]
+        chunks = list(zip(chunk_sizes, np.random.SeedSequence(self.seed).spawn(len(chunk_sizes))))
+
+        if self.jobs <= 1 or len(chunks) <= 1:
+            results = [simulate_chunk(inputs, *chunk) for chunk in chunks]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(
+                max_workers=self.jobs, initializer=_init_worker, initargs=(inputs,)) as executor:
+                results = list(executor.map(_simulate_worker_chunk, chunks))
+
+        n_athletes = len(self.field)
+        total_sums = sum((result[0] for result in results), np.zeros(n_athletes, dtype=int))
+        overall = PositionCounts.from_counts(*merge_counts([result[1] for result in results]), n_athletes)
+        category = PositionCounts.from_counts(*merge_counts([result[2] for result in results]), n_athletes)
+        return Projection(
+            names=[athlete.name for athlete in self.field],
+            categories=[athlete.age_category for athlete in self.field],
+            future_races=[race.name for race in self.future_races],
+            n_simulations=n_simulations,
+            current_totals=np.array([athlete.total_score for athlete in self.field], dtype=int),
+            expected_totals=total_sums / max(n_simulations, 1),
+            overall_positions=overall,
+            category_positions=category)
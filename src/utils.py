@@ -1,8 +1,14 @@
+import calendar
 from datetime import date, datetime
+from typing import TYPE_CHECKING
 from dateutil.relativedelta import relativedelta
 
+if TYPE_CHECKING:
+    import numpy as np
+
 DATE_FMT='%d/%m/%Y'
 KM_PER_MI = 1.60934
+SEASON_START_MONTH = 6
 
 def time_str_to_secs(time_str:str)->int:
     secs_mins_hours = time_str.split(':')[::-1]
@@ -28,9 +34,34 @@ def date_from_str(date_str:str)->date:
 def date_to_str(date_:date)->str:
     return date_.strftime(DATE_FMT)
 
-def years_since(dob:date, other_date:date=date.today())->int:
+def years_since(dob:date, other_date:date=None)->int: #type: ignore
+    #Today as of the call, not as of when the module was imported
+    if other_date is None:
+        other_date = date.today()
     return relativedelta(other_date, dob).years
 
+def years_since_batch(dobs:list[date], other_date:date)->'np.ndarray':
+    #Whole years between each DOB and the other date, matching years_since
+    import numpy as np
+    dob_days = np.array(dobs, dtype='datetime64[D]')
+    dob_years = dob_days.astype('datetime64[Y]')
+    dob_months = dob_days.astype('datetime64[M]')
+    dob_month_day = 100*(dob_months - dob_years).astype(int) + (dob_days - dob_months).astype(int)
+    other_month_day = 100*(other_date.month-1) + other_date.day-1
+    if not calendar.isleap(other_date.year):
+        #As relativedelta, 29th Feb birthdays fall on the 28th in non-leap years
+        dob_month_day[dob_month_day == 128] = 127
+    return (other_date.year - 1970) - dob_years.astype(int) - (other_month_day < dob_month_day)
+
+def season_of(race_date:date)->int:
+    #Seasons run June to May, and are referred to by the year they start
+    return race_date.year if race_date.month >= SEASON_START_MONTH else race_date.year - 1
+
+def season_label(season:int)->str:
+    first_month = calendar.month_name[SEASON_START_MONTH]
+    last_month = calendar.month_name[(SEASON_START_MONTH - 2) % 12 + 1]
+    return f'{first_month} {season} - {last_month} {season+1}'
+
 def distance_in_kms(distance:str)->float:
     distance_val, distance_units = distance.split()
     
@@ -0,0 +1,103 @@
+import time
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.race_processor import RaceProcessor
+
+RACES_DIR = Path() / 'races'
+
+@dataclass
+class Watcher:
+    #Polls the input files and, once a burst of changes has settled, rebuilds only what
+    #they affect. Polling a few hundred mtimes a second is cheap and needs nothing
+    #beyond the standard library, on any OS
+    processor:RaceProcessor
+    interval:float = 0.5
+    debounce:float = 2.0
+    rebuilds:int = 0
+    #After a failed build the processor is part way through loading, so the next one is full
+    failed:bool = False
+
+    def watched_files(self)->list[Path]:
+        files = [self.processor.athlete_list_path, self.processor.race_list_path, self.processor.aliases_path]
+        files += RACES_DIR.rglob('*.csv')
+        if self.processor.races:
+            files += [race.race_path for race in self.processor.races.values() if race.in_past]
+        return files
+
+    def current_mtimes(self)->dict[Path,int]:
+        mtimes = {}
+        for path in self.watched_files():
+            try:
+                mtimes[path] = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                pass
+        return mtimes
+
+    def rebuild(self, changed:set[Path], date_changed:bool=False):
+        start = time.perf_counter()
+        #The athlete list and alias table decide who every result belongs to
+        lists = {self.processor.athlete_list_path, self.processor.race_list_path, self.processor.aliases_path}
+        if date_changed:
+            print('Date changed, rebuilding everything')
+            self.processor.process_races()
+        elif self.failed:
+            print('Rebuilding everything after the last build failed')
+            self.processor.process_races()
+        elif lists & changed:
+            print('Athlete list, race list or alias table changed, rebuilding everything')
+            self.processor.process_races()
+        else:
+            changed_races = [
+                name for name, race in self.processor.races.items() if race.race_path in changed]
+            if not changed_races:
+                return
+            print(f'Reloading {", ".join(changed_races)}')
+            changed_athletes = self.processor.update_races(changed_races)
+            print(f'Total score changed for {len(changed_athletes)} athletes: {", ".join(sorted(changed_athletes))}')
+
+        self.rebuilds += 1
+        print(f'Rebuilt in {time.perf_counter() - start:.2f}s')
+
+    def try_rebuild(self, changed:set[Path], date_changed:bool=False):
+        #Eg a race added to the race list before its CSV is in races/, which is normal on
+        #race day, so report the error and carry on watching
+        try:
+            self.rebuild(changed, date_changed)
+            self.failed = False
+        except Exception:
+            traceback.print_exc()
+            print('Rebuild failed, waiting for the next change')
+            self.failed = True
+
+    def run(self):
+        self.processor.process_races()
+        mtimes = self.current_mtimes()
+        pending:set[Path] = set()
+        last_change = 0.0
+        print(f'Watching {len(mtimes)} files for changes (Ctrl+C to stop)')
+        try:
+            while True:
+                time.sleep(self.interval)
+                current = self.current_mtimes()
+                changed = {path for path in mtimes.keys() | current.keys() if mtimes.get(path) != current.get(path)}
+                mtimes = current
+                if changed:
+                    pending |= changed
+                    last_change = time.monotonic()
+                    continue
+
+                #Categories depend on today's date, so a new day can mean new pages
+                if not pending and not self.processor.calendar.is_current:
+                    self.try_rebuild(set(), date_changed=True)
+                    mtimes = self.current_mtimes()
+                    continue
+
+                #Wait for the files to stop changing, so a burst of saves is one rebuild
+                if pending and time.monotonic() - last_change >= self.debounce:
+                    self.try_rebuild(pending)
+                    pending = set()
+                    mtimes = self.current_mtimes()
+        except KeyboardInterrupt:
+            print(f'Stopped after {self.rebuilds} rebuilds')
@@ -0,0 +1,52 @@
+from pathlib import Path
+
+import pytest
+
+from src.race_processor import RaceProcessor
+
+ATHLETES = [
+    ('Adam', 'Gooch', 'Male', '16/08/1986'),
+    ('Michael', 'Berks', 'Male', '09/02/1980'),
+    ('Tom', 'Sullivan', 'Male', '01/06/1995'),
+    ('Lisa', 'Craig', 'Female', '04/04/1975'),
+    ('Emma', 'Simpson', 'Female', '23/11/2001'),
+]
+
+#Name, distance, date, 5k, marathon, results (name, time)
+RACES = [
+    ('Wilmslow 10k', '10 km', '13/07/2025', 0, 0, [
+        ('Adam Gooch', '00:36:10'), ('Michael Berks', '00:33:36'), ('Lisa Craig', '00:41:02')]),
+    ('Wizard 5', '7.63 km', '29/07/2025', 0, 0, [
+        ('Michael Berks', '00:28:03'), ('Tom Sullivan', '00:30:08'), ('Emma Simpson', '00:33:40')]),
+    ('Dunham Massey 5k', '5 km', '05/06/2025', 1, 0, [
+        ('Michael Berks', '00:15:54'), ('Adam Gooch', '00:17:20'), ('Lisa Craig', '00:21:15')]),
+    ('Oulton Park 5k', '5 km', '22/03/2026', 1, 0, [
+        ('Tom Sullivan', '00:16:40'), ('Emma Simpson', '00:19:05')]),
+    ('Chester Marathon', '42.195 km', '05/10/2025', 0, 1, [
+        ('Michael Berks', '02:34:03'), ('Lisa Craig', '03:04:37')]),
+    ('London Marathon', '42.195 km', '26/04/2026', 0, 1, [
+        ('Tom Sullivan', '02:40:12')]),
+]
+
+def results_path(race_name:str)->Path:
+    return Path('races') / f'{race_name.lower().replace(" ", "_")}_results.csv'
+
+def write_results(race_name:str, results:list[tuple[str,str]]):
+    results_path(race_name).write_text(''.join(f'{name}, {time}\n' for name, time in results))
+
+@pytest.fixture
+def league(tmp_path, monkeypatch):
+    #A small league laid out like the repo (athletes_list.csv, race_list.csv and races/),
+    #with the working directory moved into it. Returns a function making a processor
+    monkeypatch.chdir(tmp_path)
+    Path('races').mkdir()
+    Path('athletes_list.csv').write_text(''.join(','.join(row) + '\n' for row in ATHLETES))
+    race_list = ['Race, Distance, Date, 5k, Marathon, Datafile\n']
+    for name, distance, race_date, is_5k, is_marathon, results in RACES:
+        race_list.append(f'{name},{distance},{race_date},{is_5k},{is_marathon},{results_path(name).as_posix()}\n')
+        write_results(name, results)
+    Path('race_list.csv').write_text(''.join(race_list))
+
+    def make_processor()->RaceProcessor:
+        return RaceProcessor(athlete_list_path=Path('athletes_list.csv'), race_list_path=Path('race_list.csv'))
+    return make_processor
@@ -0,0 +1,51 @@
+from datetime import date
+
+from src.athlete import TOTAL_RACES, Athlete
+from src.race_entry import RaceEntry
+
+def race_entry(race_name:str, score:int, is_5k:bool=False, is_marathon:bool=False)->RaceEntry:
+    return RaceEntry(
+        race_name=race_name, athlete='Adam Gooch', race_date=date(2025, 7, 13), time=2000, distance=10.0, male=True,
+        is_5k=is_5k, is_marathon=is_marathon, time_score=score, age_pct=70.0)
+
+def make_athlete(races:list[RaceEntry])->Athlete:
+    athlete = Athlete('Adam Gooch', date(1986, 8, 16), True)
+    for race in races:
+        athlete.add_race(race, age_grade=False)
+    athlete.update_scores_lists()
+    return athlete
+
+def test_lone_zero_point_5k_is_not_required():
+    #With no marathon, a 5k that scored nothing on the combined leaderboard only counts
+    #if it makes the club races, and the club races win ties
+    club_races = [race_entry(f'Club race {i_race}', 0) for i_race in range(TOTAL_RACES)]
+    best_5k = race_entry('Dunham Massey 5k', 0, is_5k=True)
+    athlete = make_athlete(club_races + [best_5k])
+
+    assert athlete.required_races == (None, best_5k)
+    assert not best_5k.counting
+    assert best_5k not in athlete.counting_races
+    assert athlete.counting_races == club_races[:TOTAL_RACES-1]
+
+def test_lone_zero_point_5k_fills_a_spare_place():
+    club_races = [race_entry('Club race', 10)]
+    best_5k = race_entry('Dunham Massey 5k', 0, is_5k=True)
+    athlete = make_athlete(club_races + [best_5k])
+
+    assert athlete.counting_races == club_races + [best_5k]
+
+def test_lone_scoring_5k_is_required():
+    club_races = [race_entry(f'Club race {i_race}', 20) for i_race in range(TOTAL_RACES)]
+    best_5k = race_entry('Dunham Massey 5k', 5, is_5k=True)
+    athlete = make_athlete(club_races + [best_5k])
+
+    assert athlete.counting_races[0] is best_5k
+    assert best_5k.counting
+
+def test_lone_zero_point_marathon_is_required():
+    #The marathon comes first on a tie, as it did against the placeholder 5k
+    club_races = [race_entry(f'Club race {i_race}', 0) for i_race in range(TOTAL_RACES)]
+    best_marathon = race_entry('Chester Marathon', 0, is_marathon=True)
+    athlete = make_athlete(club_races + [best_marathon])
+
+    assert athlete.counting_races[0] is best_marathon
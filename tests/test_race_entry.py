@@ -0,0 +1,40 @@
+import random
+from datetime import date
+
+import pytest
+
+import src.race_entry as race_entry_module
+from src.race_entry import MARATHON_KM, AgeFactorCache, RaceEntry, age_pct_batch
+
+class FakeAgeGrader:
+    #A made up but age, sex and distance dependent standard, so the tests don't need the
+    #age grading tables
+    def age_graded_performance_factor(self, age:int, gender:str, distance:float, time:float)->float:
+        standard = (780.0 if gender == 'm' else 870.0) * (distance / 5.0) ** 1.06 * (1 + max(age - 30, 0) / 97)
+        return standard / time
+
+@pytest.fixture(autouse=True)
+def age_grader(monkeypatch):
+    monkeypatch.setattr(race_entry_module, '_age_grader', FakeAgeGrader())
+    monkeypatch.setattr(race_entry_module, 'age_factor_cache', AgeFactorCache())
+
+def test_batch_matches_scalar_exactly():
+    rng = random.Random(0)
+    distances = [5.0, 8.04672, 10.0, 16.0934, 21.0975, MARATHON_KM]
+    entries = [
+        (rng.randrange(16, 85), rng.random() < 0.5, rng.choice(distances), rng.randrange(900, 20000))
+        for _ in range(2000)]
+    ages, males, entry_distances, times = zip(*entries)
+    age_pcts = age_pct_batch(ages, males, entry_distances, times).tolist()
+
+    grader = FakeAgeGrader()
+    for (age, male, distance, time), age_pct in zip(entries, age_pcts):
+        standard = grader.age_graded_performance_factor(age, 'm' if male else 'f', distance, 1)
+        assert age_pct == 100*(standard/time)
+
+def test_race_entry_matches_batch():
+    race_entry = RaceEntry(
+        race_name='Wilmslow 10k', athlete='Adam Gooch', race_date=date(2025, 7, 13), time=2170, distance=10.0,
+        male=True, is_5k=False, is_marathon=False)
+    race_entry.compute_age_pct(date(1986, 8, 16))
+    assert race_entry.age_pct == age_pct_batch([38], [True], 10.0, [2170])[0]
@@ -0,0 +1,45 @@
+from tests.conftest import RACES, write_results
+
+def entry_state(processor)->dict:
+    return {
+        name: [
+            (race_entry.race_name, race_entry.time_score, race_entry.age_pct_score, race_entry.counting)
+            for race_entry in sorted(athlete.races, key=lambda race_entry:race_entry.race_name)]
+        for name, athlete in processor.athletes.items()}
+
+def combined_state(race)->list:
+    return [(race_entry.athlete, race_entry.race_name, race_entry.total_score) for race_entry in race.athletes]
+
+def rescore_matches_full_build(league, race_name:str, results:list[tuple[str,str]]):
+    processor = league()
+    processor.score_league()
+    write_results(race_name, results)
+    processor.update_races([race_name])
+
+    fresh = league()
+    fresh.score_league()
+    assert entry_state(processor) == entry_state(fresh)
+    assert combined_state(processor.combined_5k) == combined_state(fresh.combined_5k)
+    assert combined_state(processor.combined_marathon) == combined_state(fresh.combined_marathon)
+    assert {name: athlete.total_score for name, athlete in processor.athletes.items()} == \
+        {name: athlete.total_score for name, athlete in fresh.athletes.items()}
+
+def race_results(race_name:str)->list[tuple[str,str]]:
+    return next(results for name, *_, results in RACES if name == race_name)
+
+def test_new_best_5k_displaces_old(league):
+    #Michael Berks hasn't run this 5k before, and his new time beats his old best
+    results = race_results('Oulton Park 5k') + [('Michael Berks', '00:15:00')]
+    rescore_matches_full_build(league, 'Oulton Park 5k', results)
+
+def test_new_best_marathon_displaces_old(league):
+    results = race_results('London Marathon') + [('Michael Berks', '02:20:00')]
+    rescore_matches_full_build(league, 'London Marathon', results)
+
+def test_removed_best_5k(league):
+    results = [result for result in race_results('Dunham Massey 5k') if result[0] != 'Adam Gooch']
+    rescore_matches_full_build(league, 'Dunham Massey 5k', results)
+
+def test_club_race_edit(league):
+    results = race_results('Wizard 5') + [('Adam Gooch', '00:29:00')]
+    rescore_matches_full_build(league, 'Wizard 5', results)